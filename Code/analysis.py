@@ -0,0 +1,215 @@
+# analysis.py
+
+# Schedulability analysis for periodic task sets (Task lists or TaskSets).
+#
+# The tests answer "will the simulator see any deadline miss?" without
+# simulating. They assume what the simulator does: all tasks released
+# together at t=0, integer times, RM priorities by period (ties broken by
+# tid) and deadlines no longer than periods. A True answer is a proof of
+# "no misses"; False / None only means "not proven".
+
+import heapq
+import math
+from fractions import Fraction
+
+# float sums this close to a bound are re-checked exactly with Fractions
+# (far bigger than the rounding error of math.fsum, far smaller than any
+# real margin)
+_FLOAT_MARGIN = 1e-9
+
+# the exact RM test is O(n^2); above this many tasks it is not tried
+RTA_MAX_TASKS = 2000
+
+# the EDF processor-demand test checks h(L) at every absolute deadline up
+# to its bound (up to the hyperperiod when U = 1); past this many distinct
+# deadlines it gives up
+DBF_MAX_POINTS = 200_000
+
+
+def utilization(tasks):
+    """
+    Total CPU utilization U = sum(exec_time / period).
+    """
+    return sum(t.exec_time / t.period for t in tasks)
+
+
+def _exact_utilization(tasks):
+    # as a Fraction, so "U <= 1" is never decided by rounding
+    return sum((Fraction(t.exec_time, t.period) for t in tasks), Fraction(0))
+
+
+def _utilization_above_one(tasks):
+    """
+    Exactly "U > 1". Decided in floats unless U is within
+    _FLOAT_MARGIN of 1 (Fraction sums get slow with many tasks).
+    """
+    u = math.fsum(t.exec_time / t.period for t in tasks)
+    if abs(u - 1) > _FLOAT_MARGIN:
+        return u > 1
+    return _exact_utilization(tasks) > 1
+
+
+def utilization_at_most_one(tasks):
+    """
+    Exactly "U <= 1": necessary for any policy to meet every deadline on
+    one CPU, but for most policies not enough.
+    """
+    return not _utilization_above_one(tasks)
+
+
+def hyperperiod(tasks):
+    """
+    LCM of the task periods: the schedule repeats after this long.
+    """
+    return math.lcm(*(t.period for t in tasks)) if len(tasks) else 1
+
+
+def _implicit_deadlines(tasks):
+    return all(t.deadline == t.period for t in tasks)
+
+
+def _constrained_deadlines(tasks):
+    return all(t.deadline <= t.period for t in tasks)
+
+
+# ---------- Rate Monotonic ----------
+
+def liu_layland_bound(n):
+    """
+    Liu & Layland utilization bound n(2^(1/n) - 1) for n tasks.
+    """
+    if n == 0:
+        return 1.0
+    return n * (2 ** (1 / n) - 1)
+
+
+def rm_liu_layland_test(tasks):
+    """
+    Sufficient RM test: U <= n(2^(1/n) - 1), deadlines = periods.
+    """
+    return (_implicit_deadlines(tasks)
+            and utilization(tasks) <= liu_layland_bound(len(tasks)))
+
+
+def rm_hyperbolic_test(tasks):
+    """
+    Sufficient RM test (Bini et al.): prod(U_i + 1) <= 2, deadlines = periods.
+    Never weaker than the Liu & Layland bound.
+    """
+    if not _implicit_deadlines(tasks):
+        return False
+    # log(prod) in floats first; exact product only when it is close to 2
+    log_product = math.fsum(math.log1p(t.exec_time / t.period) for t in tasks)
+    if abs(log_product - math.log(2)) > _FLOAT_MARGIN:
+        return log_product < math.log(2)
+    product = Fraction(1)
+    for t in tasks:
+        product *= Fraction(t.exec_time, t.period) + 1
+    return product <= 2
+
+
+def rm_response_times(tasks):
+    """
+    Exact worst-case response time of every task under RM
+    (response-time analysis):  R = C_i + sum_{higher j} ceil(R / T_j) C_j.
+    Returns {tid: R}, with None for a task whose iteration passes its
+    deadline (it can miss).
+    """
+    order = sorted(tasks, key=lambda t: (t.period, t.tid))
+    result = {}
+    higher = []
+    for t in order:
+        response = t.exec_time + sum(c for _, c in higher)
+        while True:
+            if response > t.deadline:
+                response = None
+                break
+            demand = t.exec_time + sum(
+                math.ceil(response / p) * c for p, c in higher
+            )
+            if demand == response:
+                break
+            response = demand
+        result[t.tid] = response
+        higher.append((t.period, t.exec_time))
+    return result
+
+
+def rm_schedulable(tasks):
+    """
+    True if no RM job can miss its deadline; None if deadlines exceed
+    periods (not covered). Tries the cheap hyperbolic bound (which
+    implies Liu & Layland) before the exact test; None as well if that
+    fails for a set of more than RTA_MAX_TASKS tasks.
+    """
+    if not _constrained_deadlines(tasks):
+        return None
+    if rm_hyperbolic_test(tasks):
+        return True
+    if len(tasks) > RTA_MAX_TASKS:
+        return None
+    return all(r is not None for r in rm_response_times(tasks).values())
+
+
+# ---------- Earliest Deadline First ----------
+
+def demand_bound(tasks, length):
+    """
+    Processor demand h(L): work of all jobs released and due within [0, L].
+    """
+    return sum(
+        max(0, (length - t.deadline) // t.period + 1) * t.exec_time
+        for t in tasks
+    )
+
+
+def edf_schedulable(tasks):
+    """
+    Exact EDF test: U <= 1 when deadlines = periods, otherwise the
+    processor-demand test h(L) <= L at every absolute deadline L up to
+    the usual bound. None if deadlines exceed periods, or if there are
+    more than DBF_MAX_POINTS deadlines to check (not covered).
+    """
+    if not _constrained_deadlines(tasks):
+        return None
+    if _utilization_above_one(tasks):
+        return False
+    if _implicit_deadlines(tasks):
+        return True
+    u = _exact_utilization(tasks)
+
+    limit = hyperperiod(tasks) + max(t.deadline for t in tasks)
+    if u < 1:
+        busy = sum((t.period - t.deadline) * t.exec_time / t.period for t in tasks)
+        limit = min(limit, max(max(t.deadline for t in tasks), busy / (1 - u)))
+
+    # the deadlines in increasing order, generated as they are checked
+    deadlines = heapq.merge(*(range(t.deadline, int(limit) + 1, t.period) for t in tasks))
+    checked = 0
+    previous = None
+    for length in deadlines:
+        if length == previous:
+            continue
+        previous = length
+        checked += 1
+        if checked > DBF_MAX_POINTS:
+            return None
+        if demand_bound(tasks, length) > length:
+            return False
+    return True
+
+
+# ---------- Simulator modes ----------
+
+def no_misses(tasks, mode):
+    """
+    True if a simulation in 'mode' ("RM_ONLY", "EDF_ONLY", "ADAPTIVE",
+    or the policy name "RM" or "EDF") provably has no deadline misses.
+    ADAPTIVE only leaves RM after a miss, so it is covered by the RM test.
+    There is no test here for the other policies (always False).
+    """
+    if mode in ("EDF_ONLY", "EDF"):
+        return edf_schedulable(tasks) is True
+    if mode in ("RM_ONLY", "RM", "ADAPTIVE"):
+        return rm_schedulable(tasks) is True
+    return False
@@ -0,0 +1,592 @@
+# aperiodic.py
+
+import heapq
+import random
+from collections import deque, namedtuple
+
+from events import Complete
+from policies import POLICIES
+from scheduler import AdaptiveScheduler
+from simulation import MODES
+from task_model import TaskSet
+
+# One line of an arrival trace:
+#   kind "aperiodic": a one-off job 'ref' (any id) needing exec_time units
+#   kind "sporadic":  a job of the sporadic task with tid 'ref'
+#                     (exec_time is ignored, the task's own is used)
+Arrival = namedtuple("Arrival", "time kind ref exec_time")
+
+ARRIVAL_KINDS = ("aperiodic", "sporadic")
+
+
+def read_arrivals(path):
+    """
+    Stream the arrivals of a trace file, one line at a time (the file is
+    never loaded as a whole, so it can be far larger than memory).
+
+    Format: CSV lines "time,kind,ref[,exec_time]" in time order; an
+    optional "time,..." header, blank lines and '#' comments are skipped.
+    Yields Arrival tuples; raises ValueError (with the line number) on a
+    malformed line or a time going backwards.
+    """
+    last = None
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#") or line.startswith("time"):
+                continue
+            fields = [field.strip() for field in line.split(",")]
+            try:
+                time = int(fields[0])
+                kind = fields[1]
+                ref = int(fields[2])
+                exec_time = int(fields[3]) if len(fields) > 3 and fields[3] else 0
+            except (IndexError, ValueError):
+                raise ValueError(f"{path}:{number}: bad arrival line: {line!r}") from None
+            if kind not in ARRIVAL_KINDS:
+                raise ValueError(f"{path}:{number}: unknown arrival kind {kind!r}")
+            if kind == "aperiodic" and exec_time < 1:
+                raise ValueError(f"{path}:{number}: aperiodic job needs exec_time >= 1")
+            if last is not None and time < last:
+                raise ValueError(f"{path}:{number}: time {time} is before {last}")
+            last = time
+            yield Arrival(time, kind, ref, exec_time)
+
+
+def write_arrivals(arrivals, path):
+    """
+    Write Arrival tuples to a trace file (the format of read_arrivals()),
+    streaming. Returns the number of lines written.
+    """
+    n = 0
+    with open(path, "w") as f:
+        f.write("time,kind,ref,exec_time\n")
+        for a in arrivals:
+            f.write(f"{a.time},{a.kind},{a.ref},{a.exec_time}\n")
+            n += 1
+    return n
+
+
+def random_arrivals(until, mean_gap, mean_exec, seed=0, first_ref=1):
+    """
+    Aperiodic jobs with exponential gaps (Poisson arrivals, 'mean_gap'
+    time units apart on average) and exponential execution times
+    (at least 1), up to time 'until'. A lazy generator.
+    """
+    rng = random.Random(seed)
+    time = 0.0
+    ref = first_ref
+    while True:
+        time += rng.expovariate(1 / mean_gap)
+        if time >= until:
+            return
+        yield Arrival(int(time), "aperiodic", ref, max(1, round(rng.expovariate(1 / mean_exec))))
+        ref += 1
+
+
+class ResponseStats:
+    """
+    Running response-time totals of aperiodic jobs (constant memory).
+    """
+
+    def __init__(self):
+        self.arrived = 0
+        self.completed = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, response):
+        self.completed += 1
+        self.total += response
+        self.max = max(self.max, response)
+
+    def summary(self):
+        """
+        {"arrived", "completed", "pending", "mean_response", "max_response"}
+        (mean None before the first completion).
+        """
+        return {
+            "arrived": self.arrived,
+            "completed": self.completed,
+            "pending": self.arrived - self.completed,
+            "mean_response": self.total / self.completed if self.completed else None,
+            "max_response": self.max if self.completed else None,
+        }
+
+
+# ---------- Servers ----------
+# A server is a periodic "task" (its own TaskSet row, so every policy can
+# rank it) whose budget is spent on the aperiodic jobs, first come first
+# served. It is pending while it has both budget and work.
+
+class Server:
+    """
+    Base class of the aperiodic servers.
+    tid: its task id (shown in timelines and events)
+    period, budget: it may serve up to 'budget' time units per 'period'
+    """
+
+    def __init__(self, tid, period, budget):
+        if not 0 < budget <= period:
+            raise ValueError("server budget must be in 1..period")
+        self.tid = tid
+        self.period = period
+        self.capacity = budget
+        self.budget = budget
+        self.deadline = period  # deadline of the current server "job" (for EDF)
+        self.queue = deque()    # waiting jobs: [ref, arrival time, work left]
+
+    def replenish(self, now):
+        """
+        Budget rules that depend on the time alone (start of time unit 'now').
+        """
+
+    def next_replenish(self, now):
+        """
+        Earliest time (>= now) at which replenish() may change something.
+        """
+        return float("inf")
+
+    def activate(self, now):
+        """
+        The server just became pending (it has budget and a job waiting).
+        """
+
+    def served(self, now, length=1):
+        """
+        The server ran its first job for 'length' time units from 'now'.
+        """
+        self.budget -= length
+
+    def idle(self, now):
+        """
+        The server's queue just ran empty at the end of time unit 'now'.
+        """
+
+
+class PollingServer(Server):
+    """
+    Gets its full budget at every period start, but only if a job is
+    waiting right then; whatever it does not use before its queue runs
+    empty is lost until the next period.
+    """
+
+    def replenish(self, now):
+        if now % self.period == 0:
+            self.budget = self.capacity if self.queue else 0
+            self.deadline = now + self.period
+
+    def next_replenish(self, now):
+        return -(-now // self.period) * self.period
+
+    def idle(self, now):
+        self.budget = 0
+
+
+class DeferrableServer(Server):
+    """
+    Gets its full budget back at every period start and keeps it through
+    the period, so a job arriving mid-period is served at once.
+    """
+
+    def replenish(self, now):
+        if now % self.period == 0:
+            self.budget = self.capacity
+            self.deadline = now + self.period
+
+    def next_replenish(self, now):
+        return -(-now // self.period) * self.period
+
+
+class SporadicServer(Server):
+    """
+    Budget spent is given back one period after the server became ready
+    for the stretch of work it was spent on (simplified sporadic server
+    rule), so it keeps its budget for late arrivals like the deferrable
+    server but never hits lower-priority tasks harder than a periodic
+    task with the same budget and period.
+    """
+
+    def __init__(self, tid, period, budget):
+        super().__init__(tid, period, budget)
+        self.active_since = None  # start of the current stretch of work
+        self.spent = 0            # budget spent in that stretch
+        self.refills = deque()    # (time, amount) still to come
+
+    def replenish(self, now):
+        while self.refills and self.refills[0][0] <= now:
+            self.budget += self.refills.popleft()[1]
+
+    def next_replenish(self, now):
+        return max(now, self.refills[0][0]) if self.refills else float("inf")
+
+    def activate(self, now):
+        if self.active_since is None:
+            self.active_since = now
+            self.deadline = now + self.period
+
+    def served(self, now, length=1):
+        self.budget -= length
+        self.spent += length
+        if self.budget == 0:
+            self._close()
+
+    def idle(self, now):
+        if self.active_since is not None:
+            self._close()
+
+    def _close(self):
+        self.refills.append((self.active_since + self.period, self.spent))
+        self.active_since = None
+        self.spent = 0
+
+
+class BackgroundServer(Server):
+    """
+    No budget and no TaskSet row: the jobs only run when no other job is
+    pending (the classic baseline the real servers are compared with).
+    """
+
+    def __init__(self, tid):
+        self.tid = tid
+        self.queue = deque()
+
+
+SERVERS = {
+    "polling": PollingServer,
+    "deferrable": DeferrableServer,
+    "sporadic": SporadicServer,
+    "background": BackgroundServer,
+}
+
+
+# ---------- Scheduler ----------
+
+class AperiodicScheduler(AdaptiveScheduler):
+    """
+    AdaptiveScheduler plus jobs that do not arrive periodically, taken
+    from a stream of Arrival tuples (read lazily, one ahead):
+
+    - sporadic tasks (their tids in 'sporadic'): a job is released when an
+      arrival names the task, but never sooner than 'period' (the minimum
+      inter-arrival time) after its previous job; arrivals closer than
+      that wait. Their misses count like any other task's.
+    - aperiodic jobs, served by 'server' (see SERVERS; default: a
+      BackgroundServer with tid 0). Their response times go to
+      self.responses (a ResponseStats).
+
+    A server other than the BackgroundServer is added to the task set as
+    a task of its own (so a TaskSet passed in gets one more row).
+    Everything else (policies, misses, adaptation, events) works as in
+    AdaptiveScheduler; run_until() is event driven too.
+    """
+
+    def __init__(self, tasks, arrivals=(), sporadic=(), server=None, mode="RM",
+                 telemetry=None, trace=None, policies=None):
+        taskset = tasks if isinstance(tasks, TaskSet) else TaskSet.from_tasks(tasks)
+        self.server = server if server is not None else BackgroundServer(0)
+        self.server_index = None
+        if not isinstance(self.server, BackgroundServer):
+            s = self.server
+            self.server_index = taskset.append(s.tid, s.period, s.capacity)
+        super().__init__(taskset, mode=mode, telemetry=telemetry, trace=trace, policies=policies)
+        self.tasks = tasks
+
+        ts = self.taskset
+        index = {tid: i for i, tid in enumerate(ts.tid)}
+        # sporadic task index -> arrival times waiting for a release
+        self.backlog = {}
+        for tid in sporadic:
+            if tid not in index:
+                raise ValueError(f"unknown sporadic task: {tid}")
+            self.backlog[index[tid]] = deque()
+        self._index = index
+        self._scheduled = set()  # sporadic tasks with a release on the calendar
+
+        # sporadic tasks and the server are only released by arrivals
+        self.release_calendar = [
+            entry for entry in self.release_calendar
+            if entry[2] not in self.backlog and entry[2] != self.server_index
+        ]
+        heapq.heapify(self.release_calendar)
+
+        self.responses = ResponseStats()
+        self._arrivals = iter(arrivals)
+        self._next_arrival = next(self._arrivals, None)
+
+    def _job_done(self, i):
+        if i == self.server_index:
+            return
+        if i not in self.backlog:
+            super()._job_done(i)
+            return
+        self._scheduled.discard(i)
+        if self.backlog[i]:
+            self._schedule_sporadic(i, self.backlog[i].popleft())
+
+    def _schedule_sporadic(self, i, arrival):
+        ts = self.taskset
+        heapq.heappush(self.release_calendar, (max(arrival, ts.next_release[i]), ts.tid[i], i))
+        self._scheduled.add(i)
+
+    def _take_arrivals(self):
+        """
+        Handle every arrival up to now.
+        """
+        ts = self.taskset
+        while self._next_arrival is not None and self._next_arrival.time <= self.time:
+            a = self._next_arrival
+            if a.kind == "aperiodic":
+                self.server.queue.append([a.ref, a.time, a.exec_time])
+                self.responses.arrived += 1
+            else:
+                i = self._index.get(a.ref)
+                if i not in self.backlog:
+                    raise ValueError(f"arrival for a task that is not sporadic: {a.ref}")
+                if i in self._scheduled or ts.remaining_time[i] > 0:
+                    self.backlog[i].append(a.time)
+                else:
+                    self._schedule_sporadic(i, a.time)
+            self._next_arrival = next(self._arrivals, None)
+
+    def _sync_server(self):
+        """
+        Keep the server's task row in line with the server: pending (with
+        its budget as work left) while it has budget and a job waiting.
+        """
+        i = self.server_index
+        if i is None:
+            return
+        ts = self.taskset
+        s = self.server
+        if s.budget > 0 and s.queue:
+            if ts.remaining_time[i] == 0:
+                s.activate(self.time)
+            if ts.remaining_time[i] != s.budget or ts.absolute_deadline[i] != s.deadline:
+                ts.remaining_time[i] = s.budget
+                ts.absolute_deadline[i] = s.deadline
+                self._queue_job(i)
+        else:
+            ts.remaining_time[i] = 0
+
+    def _serve(self, length=1):
+        """
+        Run the server's first job for 'length' time units (at most the
+        work it has left) from now.
+        """
+        s = self.server
+        job = s.queue[0]
+        job[2] -= length
+        if job[2] == 0:
+            s.queue.popleft()
+            self.responses.add(self.time + length - job[1])
+        self.telemetry.record_busy(self.time, length)
+
+    def step(self):
+        """
+        Simulate one time unit.
+        Returns:
+            tid of the running task (the server's tid while it serves
+            an aperiodic job), or None if CPU is idle.
+        """
+        ts = self.taskset
+        s = self.server
+
+        # 1) New arrivals, server budgets, then releases as usual
+        self._take_arrivals()
+        if self.server_index is not None:
+            s.replenish(self.time)
+            self._sync_server()
+        self._release_jobs()
+
+        # 2) Check for deadline misses
+        self._drop_missed_jobs()
+
+        # 3) Adapt mode based on recent performance
+        self._update_mode_adaptively()
+
+        # 4) Pick highest-priority task (the server competes as one)
+        current = self._pick()
+        if current is None:
+            # idle CPU: background service
+            if self.server_index is None and s.queue:
+                self._serve()
+                self.time += 1
+                return s.tid
+            self.time += 1
+            return None
+
+        # 5) Dispatch it (unless it is already running)
+        tid = ts.tid[current]
+        self._dispatch(current)
+
+        # 6) Run it for one time unit
+        if current == self.server_index:
+            # its work left is its budget (see _sync_server)
+            self._serve()
+            s.served(self.time)
+            ts.remaining_time[current] -= 1
+            if not s.queue:
+                s.idle(self.time)
+                ts.remaining_time[current] = 0
+            if ts.remaining_time[current] == 0:
+                self.running = None
+        else:
+            if self.metrics is not None:
+                self.metrics.ran(current, self.time, 1)
+            ts.remaining_time[current] -= 1
+            self.telemetry.record_busy(self.time)
+        if self._run_trackers:
+            self._ran(current, 1)
+
+        # 7) Periodic / sporadic job finished
+        if current != self.server_index and ts.remaining_time[current] == 0:
+            ts.completed_instances[current] += 1
+            self.telemetry.record_completion(
+                self.time, self.time + 1 - ts.absolute_deadline[current]
+            )
+            self._job_done(current)
+            self.running = None
+            if self._event_sink is not None:
+                self._event_sink(Complete(self.time + 1, tid))
+
+        # 8) Advance time
+        self.time += 1
+        return tid
+
+    def _advance(self, until, timeline=None):
+        """
+        As AdaptiveScheduler._advance(), with the next arrival and the
+        next server replenishment as events too, and a stretch of
+        aperiodic service ending when the job being served finishes.
+        """
+        s = self.server
+        next_event = self._next_event_time()
+        if self._next_arrival is not None:
+            next_event = min(next_event, max(self._next_arrival.time, self.time))
+        if self.server_index is not None:
+            next_event = min(next_event, s.next_replenish(self.time))
+
+        if next_event <= self.time:
+            running_tid = self.step()
+            if timeline is not None:
+                timeline.append(running_tid)
+            return
+
+        span = min(next_event, until) - self.time
+        ts = self.taskset
+        current = self._pick()
+        if current is None:
+            tid = None
+            if self.server_index is None and s.queue:
+                # background service
+                span = min(span, s.queue[0][2])
+                self._serve(span)
+                tid = s.tid
+            self.time += span
+            if timeline is not None:
+                timeline.append_run(tid, span)
+            return
+
+        tid = ts.tid[current]
+        self._dispatch(current)
+        span = min(span, ts.remaining_time[current], self.policy.run_limit(current, self.time))
+        if current == self.server_index:
+            span = min(span, s.queue[0][2])
+            self._serve(span)
+            s.served(self.time, span)
+            ts.remaining_time[current] -= span
+            if not s.queue:
+                s.idle(self.time + span - 1)
+                ts.remaining_time[current] = 0
+            if ts.remaining_time[current] == 0:
+                self.running = None
+        else:
+            if self.metrics is not None:
+                self.metrics.ran(current, self.time, span)
+            ts.remaining_time[current] -= span
+            self.telemetry.record_busy(self.time, span)
+        if self._run_trackers:
+            self._ran(current, span)
+
+        if current != self.server_index and ts.remaining_time[current] == 0:
+            ts.completed_instances[current] += 1
+            self.telemetry.record_completion(
+                self.time + span - 1,
+                self.time + span - ts.absolute_deadline[current],
+            )
+            self._job_done(current)
+            self.running = None
+            if self._event_sink is not None:
+                self._event_sink(Complete(self.time + span, tid))
+
+        self.time += span
+        if timeline is not None:
+            timeline.append_run(tid, span)
+
+    def run_cyclic(self, until, timeline=None):
+        """
+        Not available: an arrival stream does not repeat.
+        """
+        raise NotImplementedError("arrival streams do not repeat; use run_until()")
+
+
+def run_aperiodic(tasks, mode, sim_time, arrivals=(), sporadic=(), server=None,
+                  window_size=50, switch_threshold=3, timeline=None,
+                  switch_back_threshold=None, min_dwell=0, policies=None):
+    """
+    Simulate periodic/sporadic tasks plus aperiodic jobs (see
+    AperiodicScheduler) under one comparison mode, as run_simulation().
+
+    arrivals: iterable of Arrival tuples in time order, e.g.
+        read_arrivals(path), consumed lazily
+    server: a Server (default: background service)
+
+    Returns the run_simulation() totals (of the periodic and sporadic
+    tasks) plus "aperiodic": ResponseStats.summary() of the aperiodic
+    jobs (response time = finish - arrival; the key figure here).
+    """
+    if mode not in MODES and mode not in POLICIES:
+        raise ValueError(f"unknown mode: {mode}")
+
+    if mode == "ADAPTIVE":
+        policies = tuple(policies or ("RM", "EDF"))
+    elif mode in POLICIES:
+        policies = (mode, mode)
+    else:
+        policies = ("RM", "EDF")
+    start = "EDF" if mode == "EDF_ONLY" else policies[0]
+    scheduler = AperiodicScheduler(tasks, arrivals, sporadic, server, mode=start, policies=policies)
+    scheduler.window_size = window_size
+    scheduler.switch_threshold = switch_threshold
+    if mode != "ADAPTIVE":
+        scheduler.switch_threshold = 10**9
+    else:
+        scheduler.switch_back_threshold = switch_back_threshold
+        scheduler.min_dwell = min_dwell
+
+    scheduler.run_until(sim_time, timeline)
+
+    ts = scheduler.taskset
+    own = [i for i in range(len(ts)) if i != scheduler.server_index]
+    return {
+        "completed": sum(ts.completed_instances[i] for i in own),
+        "missed": sum(ts.missed_deadlines[i] for i in own),
+        "final_mode": scheduler.mode,
+        "switch_time": scheduler.switch_time,
+        "switches": scheduler.switches,
+        "aperiodic": scheduler.responses.summary(),
+    }
+
+
+if __name__ == "__main__":
+    from simulation import make_tasks
+
+    specs = [(1, 10, 3), (2, 15, 4), (3, 40, 5)]
+    for name, cls in SERVERS.items():
+        server = cls(9) if cls is BackgroundServer else cls(9, 10, 2)
+        arrivals = random_arrivals(5000, mean_gap=20, mean_exec=2, seed=1)
+        result = run_aperiodic(make_tasks(specs), "RM_ONLY", 5000, arrivals, server=server)
+        stats = result["aperiodic"]
+        print(f"{name:<11} missed {result['missed']:>3}  aperiodic: {stats['completed']}/{stats['arrived']}"
+              f" mean response {stats['mean_response']:.1f} max {stats['max_response']}")
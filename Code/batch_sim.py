@@ -0,0 +1,189 @@
+# batch_sim.py
+
+import numpy as np
+
+from task_model import TaskSet
+
+RM, EDF = 0, 1
+MODE_NAMES = {RM: "RM", EDF: "EDF"}
+
+# "never" for times and priority keys
+_NEVER = np.iinfo(np.int64).max // 4
+
+
+class BatchSimulator:
+    """
+    Simulates many independent task sets in lockstep with NumPy.
+
+    Row b of every array is task set b and column j its j-th task, so one
+    time step of all task sets is a handful of array operations.
+    The rules are the same as AdaptiveScheduler.step(): release, drop jobs
+    that missed their deadline, adapt RM -> EDF on too many misses in the
+    look-back window, then run the highest-priority ready job for one unit.
+    Completion and miss counts match running each set through
+    AdaptiveScheduler on its own.
+
+    Task sets with fewer tasks are padded with dummy tasks (period 0)
+    that are never released.
+    """
+
+    def __init__(self, periods, exec_times, deadlines=None, tids=None,
+                 mode="ADAPTIVE", window_size=50, switch_threshold=3):
+        """
+        periods, exec_times, deadlines, tids: (n_sets, n_tasks) arrays;
+            a period of 0 marks a padding slot.
+            deadlines default to the periods, tids to 1..n_tasks.
+        mode: "RM_ONLY", "EDF_ONLY" or "ADAPTIVE" (as in run_simulation_mode)
+        """
+        period = np.atleast_2d(np.asarray(periods, dtype=np.int64))
+        exec_time = np.atleast_2d(np.asarray(exec_times, dtype=np.int64))
+        if deadlines is None:
+            deadline = period.copy()
+        else:
+            deadline = np.atleast_2d(np.asarray(deadlines, dtype=np.int64))
+        if tids is None:
+            tid = np.broadcast_to(np.arange(1, period.shape[1] + 1), period.shape)
+        else:
+            tid = np.atleast_2d(np.asarray(tids, dtype=np.int64))
+        if not (period.shape == exec_time.shape == deadline.shape == tid.shape):
+            raise ValueError("task arrays must all have the same shape")
+
+        valid = period > 0
+        tid = np.where(valid, tid, _NEVER)
+
+        # The scalar scheduler breaks priority ties by tid; argmin picks
+        # the first column, so keep every row ordered by tid.
+        order = np.argsort(tid, axis=1, kind="stable")
+        take = lambda a: np.take_along_axis(a, order, axis=1)
+        self.tid = take(tid)
+        self.period = take(period)
+        self.exec_time = take(exec_time)
+        self.deadline = take(deadline)
+        self.valid = take(valid)
+
+        n_sets = period.shape[0]
+        self.time = 0
+        self.next_release = np.where(self.valid, 0, _NEVER)
+        self.remaining_time = np.zeros_like(self.period)
+        self.absolute_deadline = np.zeros_like(self.period)
+        self.completed_instances = np.zeros_like(self.period)
+        self.missed_deadlines = np.zeros_like(self.period)
+
+        # mode per task set, and when it switched (-1 = never)
+        if mode == "EDF_ONLY":
+            self.mode = np.full(n_sets, EDF, dtype=np.int8)
+        else:
+            self.mode = np.full(n_sets, RM, dtype=np.int8)
+        self.switch_time = np.full(n_sets, -1, dtype=np.int64)
+        self.adaptive = mode == "ADAPTIVE"
+
+        # look-back window: ring buffer of "any miss this step" flags per set
+        self.window_size = window_size
+        self.switch_threshold = switch_threshold
+        self.miss_window = np.zeros((n_sets, window_size), dtype=np.int8)
+        self.misses_recent = np.zeros(n_sets, dtype=np.int64)
+
+    @classmethod
+    def from_task_sets(cls, task_sets, **kwargs):
+        """
+        Build from a sequence of task sets (lists of Task objects or
+        TaskSets), padding them to the largest one.
+        """
+        task_sets = [
+            ts if isinstance(ts, TaskSet) else TaskSet.from_tasks(list(ts))
+            for ts in task_sets
+        ]
+        n_sets = len(task_sets)
+        n_tasks = max((len(ts) for ts in task_sets), default=0)
+
+        arrays = {
+            name: np.zeros((n_sets, n_tasks), dtype=np.int64)
+            for name in ("tid", "period", "exec_time", "deadline")
+        }
+        for b, ts in enumerate(task_sets):
+            for name, a in arrays.items():
+                a[b, :len(ts)] = getattr(ts, name)
+
+        return cls(arrays["period"], arrays["exec_time"], arrays["deadline"],
+                   arrays["tid"], **kwargs)
+
+    def step(self):
+        """
+        Simulate one time unit of every task set.
+        """
+        t = self.time
+        rem = self.remaining_time
+
+        # 1) Release new jobs if it's time
+        release = (rem == 0) & (self.next_release <= t)
+        np.copyto(self.next_release, t + self.period, where=release)
+        np.copyto(rem, self.exec_time, where=release)
+        np.copyto(self.absolute_deadline, t + self.deadline, where=release)
+
+        # 2) Check for deadline misses (and drop those jobs)
+        missed = (rem > 0) & (self.absolute_deadline < t)
+        self.missed_deadlines += missed
+        rem[missed] = 0
+
+        slot = t % self.window_size
+        missed_this_step = missed.any(axis=1)
+        self.misses_recent -= self.miss_window[:, slot]
+        self.miss_window[:, slot] = missed_this_step
+        self.misses_recent += missed_this_step
+
+        # 3) Adapt mode based on recent performance
+        if self.adaptive and t + 1 >= self.window_size:
+            switch = (self.mode == RM) & (self.misses_recent > self.switch_threshold)
+            if switch.any():
+                self.mode[switch] = EDF
+                self.switch_time[switch] = t
+
+        # 4-5) Pick the highest-priority ready job of each set
+        ready = rem > 0
+        key = np.where(self.mode[:, None] == EDF, self.absolute_deadline, self.period)
+        key = np.where(ready, key, _NEVER)
+        pick = key.argmin(axis=1)
+        rows = np.flatnonzero(ready.any(axis=1))
+        cols = pick[rows]
+
+        # 6-7) Run it for one time unit; count finished jobs
+        rem[rows, cols] -= 1
+        done = rem[rows, cols] == 0
+        self.completed_instances[rows[done], cols[done]] += 1
+
+        # 8) Advance time
+        self.time += 1
+
+    def run_until(self, until):
+        """
+        Simulate every task set up to (but not including) time 'until'.
+        """
+        while self.time < until:
+            self.step()
+        return self
+
+    def totals(self):
+        """
+        Per task set: (jobs completed, deadlines missed, final mode name).
+        """
+        return (
+            self.completed_instances.sum(axis=1),
+            self.missed_deadlines.sum(axis=1),
+            [MODE_NAMES[m] for m in self.mode],
+        )
+
+
+def compare_modes(task_sets, sim_time, window_size=50, switch_threshold=3):
+    """
+    Batch version of the RM / EDF / Adaptive comparison done by
+    web_app.run_simulation_mode.
+    Returns {mode: (completed per set, missed per set, final mode per set)}.
+    """
+    results = {}
+    for mode in ("RM_ONLY", "EDF_ONLY", "ADAPTIVE"):
+        sim = BatchSimulator.from_task_sets(
+            task_sets, mode=mode,
+            window_size=window_size, switch_threshold=switch_threshold,
+        )
+        results[mode] = sim.run_until(sim_time).totals()
+    return results
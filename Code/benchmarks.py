@@ -0,0 +1,363 @@
+# benchmarks.py
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from policies import POLICIES
+from task_model import Task
+from scheduler import AdaptiveScheduler
+from simulation import MODES, make_tasks, run_simulation
+
+# default grid of the suite; --quick uses the small sizes only
+SIZES = (3, 30, 300, 3000, 30000, 100000)
+QUICK_SIZES = (3, 30, 300)
+UTILIZATIONS = (0.5, 0.9, 1.2)
+
+# result fields compared against a baseline: higher is better for the
+# rates, lower is better for memory
+RATE_FIELDS = ("ticks_per_sec", "events_per_sec", "calls_per_sec")
+MEMORY_FIELDS = ("peak_bytes",)
+
+
+def make_sparse_task_set(n, seed=0):
+    """
+    n tasks with long periods (10n .. 20n time units) and short jobs,
+    so only a handful of tasks are due in any single time unit.
+    Total utilization stays around 0.1 whatever n is.
+    """
+    rng = random.Random(seed)
+    return [
+        Task(tid=i + 1, period=rng.randint(10 * n, 20 * n), exec_time=1)
+        for i in range(n)
+    ]
+
+
+def make_task_specs(n, utilization, seed=0):
+    """
+    (tid, period, exec_time) specs of n tasks with a total utilization
+    close to 'utilization'. Periods grow with n so every job still
+    takes a few time units.
+    """
+    rng = random.Random(f"{seed}:{n}:{utilization}")
+    low = max(10, math.ceil(4 * n / utilization))
+    shares = [rng.random() for _ in range(n)]
+    total = sum(shares)
+    specs = []
+    for tid, share in enumerate(shares, 1):
+        period = rng.randint(low, 10 * low)
+        specs.append((tid, period, max(1, round(period * utilization * share / total))))
+    return specs
+
+
+def bench_step_scaling(sizes=(10, 100, 1000, 10000), ticks=20000, seed=0):
+    """
+    Measure the cost of one step() as the number of tasks grows.
+    With the release/deadline calendars this should stay roughly flat.
+    Returns a list of (n_tasks, microseconds_per_tick).
+    """
+    results = []
+    for n in sizes:
+        tasks = make_sparse_task_set(n, seed)
+        scheduler = AdaptiveScheduler(tasks, mode="RM")
+        scheduler.switch_threshold = 10**9
+
+        # skip the start, where every task is released at t=0
+        scheduler.run_until(20 * n)
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            scheduler.step()
+        elapsed = time.perf_counter() - start
+
+        results.append((n, elapsed / ticks * 1e6))
+    return results
+
+
+def bench_policies(sizes=(10, 100, 1000, 10000), ticks=20000, seed=0):
+    """
+    Cost of one scheduling decision (one busy step()) for every
+    registered policy on its own, as the number of tasks grows. The
+    task sets are overloaded (utilization 1.2) so the CPU never idles.
+    Returns a list of (policy, n_tasks, microseconds_per_decision).
+    """
+    results = []
+    for name in POLICIES:
+        for n in sizes:
+            work = _policy_case(make_task_specs(n, 1.2, seed), name, ticks)()
+            start = time.perf_counter()
+            counts = work()
+            elapsed = time.perf_counter() - start
+            results.append((name, n, elapsed / counts["calls"] * 1e6))
+    return results
+
+
+# ---------- Suite ----------
+
+def _scheduler(specs, mode):
+    # same set-up as run_simulation() for the comparison modes
+    scheduler = AdaptiveScheduler(make_tasks(specs), mode="EDF" if mode == "EDF_ONLY" else "RM")
+    if mode != "ADAPTIVE":
+        scheduler.switch_threshold = 10**9
+    return scheduler
+
+
+def _measure(setup, memory=True):
+    """
+    Time work() for work = setup(), then (if 'memory') run a fresh
+    setup() + work() under tracemalloc for the peak memory.
+    work() returns a dict of counts (ticks, events, calls).
+    Returns the counts plus "seconds" and "peak_bytes".
+    """
+    work = setup()
+    start = time.perf_counter()
+    counts = work()
+    counts["seconds"] = time.perf_counter() - start
+
+    counts["peak_bytes"] = None
+    if memory:
+        tracemalloc.start()
+        try:
+            setup()()
+            counts["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return counts
+
+
+def _step_case(specs, mode, ticks):
+    def setup():
+        scheduler = _scheduler(specs, mode)
+
+        def work():
+            for _ in range(ticks):
+                scheduler.step()
+            return {"ticks": ticks}
+        return work
+    return setup
+
+
+def _events_case(specs, mode, ticks):
+    def setup():
+        scheduler = _scheduler(specs, mode)
+
+        def work():
+            count = sum(1 for _ in scheduler.events(ticks))
+            return {"ticks": ticks, "events": count}
+        return work
+    return setup
+
+
+def _simulation_case(specs, mode, ticks):
+    # the whole run_simulation() path used by the web app and the sweeps
+    def setup():
+        tasks = make_tasks(specs)
+
+        def work():
+            run_simulation(tasks, mode, ticks)
+            return {"ticks": ticks}
+        return work
+    return setup
+
+
+def _policy_case(specs, policy, ticks):
+    # step() under one policy, counting the steps that ran a job (decisions)
+    def setup():
+        scheduler = AdaptiveScheduler(make_tasks(specs), mode=policy, policies=(policy, policy))
+
+        def work():
+            decisions = sum(1 for _ in range(ticks) if scheduler.step() is not None)
+            return {"ticks": ticks, "calls": decisions}
+        return work
+    return setup
+
+
+def _mode_switch_case(specs, calls):
+    # RM <-> EDF switches (plus the next pick) with every task's job pending
+    def setup():
+        scheduler = _scheduler(specs, "ADAPTIVE")
+        scheduler._release_jobs()
+
+        def work():
+            for k in range(calls):
+                scheduler._switch_mode("EDF" if k % 2 == 0 else "RM")
+                scheduler._pick()
+            return {"calls": calls}
+        return work
+    return setup
+
+
+def run_suite(sizes=SIZES, utilizations=UTILIZATIONS, modes=MODES,
+              ticks=2000, memory=True, seed=0, progress=None):
+    """
+    Run every benchmark over the grid of task-set sizes, utilizations
+    and modes. Returns a list of result rows (dicts) with a unique
+    "name", the case parameters, the raw counts and the rates
+    (ticks_per_sec, events_per_sec, calls_per_sec) and peak_bytes.
+
+    Benchmarks:
+        step            AdaptiveScheduler.step() once per time unit
+        events          the events() generator (event-driven engine)
+        run_simulation  the full run_simulation() path (fast path on)
+        mode_switch     an RM <-> EDF switch with all n jobs pending
+        policy          step() under each registered policy on its own
+                        (calls = decisions), overloaded task set
+    progress: optional callback called with each row as it finishes.
+    """
+    cases = []
+    for n in sizes:
+        for u in utilizations:
+            specs = make_task_specs(n, u, seed)
+            for mode in modes:
+                for bench, make in (("step", _step_case), ("events", _events_case),
+                                    ("run_simulation", _simulation_case)):
+                    cases.append((bench, mode, n, u, make(specs, mode, ticks)))
+        calls = 10000
+        cases.append(("mode_switch", None, n, None, _mode_switch_case(make_task_specs(n, 1.0, seed), calls)))
+        for policy in POLICIES:
+            cases.append(("policy", policy, n, 1.2, _policy_case(make_task_specs(n, 1.2, seed), policy, ticks)))
+
+    rows = []
+    for bench, mode, n, u, setup in cases:
+        counts = _measure(setup, memory)
+        row = {
+            "name": f"{bench}/{mode or '-'}/n={n}/u={u if u is not None else '-'}",
+            "benchmark": bench, "mode": mode, "n_tasks": n, "utilization": u,
+        }
+        row.update(counts)
+        seconds = max(counts["seconds"], 1e-9)
+        for count, rate in (("ticks", "ticks_per_sec"), ("events", "events_per_sec"),
+                            ("calls", "calls_per_sec")):
+            if count in counts:
+                row[rate] = counts[count] / seconds
+        rows.append(row)
+        if progress is not None:
+            progress(row)
+    return rows
+
+
+# ---------- Baselines ----------
+
+def save_baseline(rows, path):
+    """
+    Save suite results as a JSON baseline (with the Python version and
+    machine, since numbers from different machines do not compare).
+    """
+    data = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": rows,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(baseline, current, tolerance=0.15):
+    """
+    Compare two lists of result rows case by case (by "name").
+    A rate more than 'tolerance' (fraction) below the baseline, or a
+    peak memory more than 'tolerance' above it, is a regression.
+    Returns a list of (name, field, old, new, relative change) for all
+    compared values, and the list of regressions (same tuples).
+    """
+    old_rows = {row["name"]: row for row in baseline}
+    changes = []
+    regressions = []
+    for row in current:
+        old = old_rows.get(row["name"])
+        if old is None:
+            continue
+        for field in RATE_FIELDS + MEMORY_FIELDS:
+            if old.get(field) is None or row.get(field) is None or old[field] == 0:
+                continue
+            change = row[field] / old[field] - 1
+            item = (row["name"], field, old[field], row[field], change)
+            changes.append(item)
+            worse = change < -tolerance if field in RATE_FIELDS else change > tolerance
+            if worse:
+                regressions.append(item)
+    return changes, regressions
+
+
+def _format_row(row):
+    rates = "  ".join(
+        f"{field}={row[field]:,.0f}" for field in RATE_FIELDS if row.get(field) is not None
+    )
+    memory = f"  peak={row['peak_bytes'] / 2**20:.1f}MiB" if row.get("peak_bytes") is not None else ""
+    return f"{row['name']:<40} {rates}{memory}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scheduler benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite (optionally saving a baseline)")
+    run.add_argument("--quick", action="store_true", help=f"sizes {QUICK_SIZES} only")
+    run.add_argument("--sizes", type=int, nargs="+")
+    run.add_argument("--utilizations", type=float, nargs="+", default=UTILIZATIONS)
+    run.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    run.add_argument("--ticks", type=int, default=2000)
+    run.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    run.add_argument("--out", help="write results as a JSON baseline")
+    run.add_argument("--baseline", help="compare against this baseline afterwards")
+    run.add_argument("--tolerance", type=float, default=0.15)
+
+    cmp = commands.add_parser("compare", help="compare two saved result files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--tolerance", type=float, default=0.15)
+
+    commands.add_parser("scaling", help="cost per step() vs number of tasks")
+    commands.add_parser("policies", help="cost per scheduling decision of each policy")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "scaling":
+        print("Cost per step() vs number of tasks")
+        for n, us_per_tick in bench_step_scaling():
+            print(f"  {n:>6} tasks: {us_per_tick:8.2f} us/tick")
+        return 0
+
+    if args.command == "policies":
+        print("Cost per scheduling decision vs number of tasks")
+        for name, n, us_per_decision in bench_policies():
+            print(f"  {name:<5} {n:>6} tasks: {us_per_decision:8.2f} us/decision")
+        return 0
+
+    if args.command == "run":
+        sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+        current = run_suite(sizes, args.utilizations, args.modes, args.ticks,
+                            memory=not args.no_memory,
+                            progress=lambda row: print(_format_row(row), flush=True))
+        if args.out:
+            save_baseline(current, args.out)
+            print(f"saved {len(current)} results to {args.out}")
+        if not args.baseline:
+            return 0
+        baseline = load_baseline(args.baseline)
+    else:
+        baseline = load_baseline(args.baseline)
+        current = load_baseline(args.current)
+
+    changes, regressions = compare(baseline, current, args.tolerance)
+    for name, field, old, new, change in changes:
+        flag = "  REGRESSION" if (name, field, old, new, change) in regressions else ""
+        print(f"{name:<40} {field:<15} {old:>14,.0f} -> {new:>14,.0f} ({change:+.1%}){flag}")
+    print(f"{len(regressions)} regression(s) in {len(changes)} comparisons "
+          f"(tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
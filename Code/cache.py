@@ -0,0 +1,238 @@
+# cache.py
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+
+from simulation import ENGINE_VERSION, make_tasks, run_simulation
+from timeline import Timeline
+
+
+def cache_key(specs, mode, sim_time, window_size=50, switch_threshold=3,
+              switch_back_threshold=None, min_dwell=0, policies=None):
+    """
+    Canonical hash of one simulation: the task set (tid, period,
+    exec_time, deadline; in tid order), the mode, the horizon, the
+    adaptation settings and the engine version.
+    """
+    tasks = sorted(
+        [int(s[0]), int(s[1]), int(s[2]), int(s[3] if len(s) > 3 and s[3] is not None else s[1])]
+        for s in specs
+    )
+    canonical = json.dumps(
+        {
+            "tasks": tasks,
+            "mode": mode,
+            "sim_time": int(sim_time),
+            "window_size": int(window_size),
+            "switch_threshold": int(switch_threshold),
+            "switch_back_threshold": switch_back_threshold,
+            "min_dwell": int(min_dwell),
+            "policies": list(policies) if policies else None,
+            "engine_version": ENGINE_VERSION,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of simulation results.
+
+    Memory tier: LRU, evicting the least recently used entries once the
+    pickled size of all entries passes 'memory_bytes'.
+    Disk tier (optional): one pickle file per key in 'directory', kept
+    across runs and shared between processes. A disk hit is promoted to
+    the memory tier. put() keeps the tier within 'disk_bytes' and
+    'disk_entries' (None = no limit) by deleting the least recently used
+    files, by modification time (a disk hit touches its file).
+
+    The disk tier is read with pickle.loads, which can run arbitrary
+    code: 'directory' must be trusted, i.e. writable only by the users
+    running the simulator.
+    """
+
+    def __init__(self, memory_bytes=64 * 2**20, directory=None,
+                 disk_bytes=1024 * 2**20, disk_entries=None):
+        self.memory_bytes = memory_bytes
+        self.directory = directory
+        self.disk_bytes = disk_bytes
+        self.disk_entries = disk_entries
+        self._memory = OrderedDict()  # key -> (value, size in bytes)
+        self._memory_used = 0
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def _remember(self, key, value, size):
+        if key in self._memory:
+            self._memory_used -= self._memory.pop(key)[1]
+        if size > self.memory_bytes:
+            return
+        self._memory[key] = (value, size)
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            _, (_, old_size) = self._memory.popitem(last=False)
+            self._memory_used -= old_size
+
+    def get(self, key):
+        """
+        Cached value for 'key', or None.
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key][0]
+
+        if self.directory is not None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                value = pickle.loads(data)
+                try:
+                    # mark it recently used for _prune_disk()
+                    os.utime(self._path(key))
+                except OSError:
+                    pass
+                self._remember(key, value, len(data))
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def _prune_disk(self):
+        # 1. list the entries with their size and last use
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue  # pruned by another process
+                entries.append((info.st_mtime_ns, info.st_size, entry.path))
+        used = sum(size for _, size, _ in entries)
+        count = len(entries)
+
+        # 2. delete the least recently used until within both limits
+        entries.sort()
+        for _, size, path in entries:
+            if ((self.disk_bytes is None or used <= self.disk_bytes)
+                    and (self.disk_entries is None or count <= self.disk_entries)):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            used -= size
+            count -= 1
+
+    def put(self, key, value, to_disk=True):
+        """
+        Store 'value' under 'key' in the memory tier and, unless
+        to_disk is False, in the disk tier (then pruned to its limits).
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, value, len(data))
+
+        if to_disk and self.directory is not None:
+            # write to a temp file first so readers never see half a file
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+            if self.disk_bytes is not None or self.disk_entries is not None:
+                self._prune_disk()
+
+    def clear(self):
+        """
+        Empty both tiers.
+        """
+        self._memory.clear()
+        self._memory_used = 0
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+
+
+_default_cache = None
+
+
+def default_cache_dir():
+    """
+    Directory of the shared disk tier: $SCHEDULER_CACHE_DIR (default
+    ~/.cache/adaptive_scheduler). Its files are unpickled, so it must
+    not be writable by untrusted users.
+    """
+    return os.environ.get(
+        "SCHEDULER_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "adaptive_scheduler"),
+    )
+
+
+def default_cache():
+    """
+    Process-wide cache; its disk tier lives in default_cache_dir().
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache(directory=default_cache_dir())
+    return _default_cache
+
+
+def cached_simulation(specs, mode, sim_time, window_size=50, switch_threshold=3,
+                      with_timeline=False, engine="event", cache=None,
+                      switch_back_threshold=None, min_dwell=0, policies=None,
+                      job_metrics=False):
+    """
+    run_simulation() behind the cache.
+
+    specs: (tid, period, exec_time[, deadline]) tuples.
+    Returns {"result": run_simulation() dict,
+             "tasks": [(tid, completed, missed), ...] in tid order,
+             "timeline": Timeline or None}.
+    An entry stored without a timeline (or without the job metrics) does
+    not satisfy a request for one.
+    """
+    cache = cache if cache is not None else default_cache()
+    specs = [tuple(s) for s in specs]
+    key = cache_key(specs, mode, sim_time, window_size, switch_threshold,
+                    switch_back_threshold, min_dwell, policies)
+
+    value = cache.get(key)
+    if (value is not None
+            and (value["timeline"] is not None or not with_timeline)
+            and ("jobs" in value["result"] or not job_metrics)):
+        return value
+
+    tasks = make_tasks(specs)
+    timeline = Timeline() if with_timeline else None
+    result = run_simulation(
+        tasks, mode, sim_time,
+        window_size=window_size, switch_threshold=switch_threshold,
+        timeline=timeline, engine=engine,
+        switch_back_threshold=switch_back_threshold, min_dwell=min_dwell,
+        policies=policies, job_metrics=job_metrics,
+    )
+    value = {
+        "result": result,
+        # in tid order, like the key: a later caller may list the same
+        # tasks in another order
+        "tasks": sorted((t.tid, t.completed_instances, t.missed_deadlines) for t in tasks),
+        "timeline": timeline,
+    }
+    cache.put(key, value)
+    return value
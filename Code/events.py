@@ -0,0 +1,78 @@
+# events.py
+
+import csv
+from collections import namedtuple
+
+# Scheduler events, as yielded by AdaptiveScheduler.events().
+# 'time' is when the event happens; Complete is stamped with the end of
+# the job's last time unit.
+Release = namedtuple("Release", "time tid deadline")
+Dispatch = namedtuple("Dispatch", "time tid")
+Preempt = namedtuple("Preempt", "time tid by")
+Complete = namedtuple("Complete", "time tid")
+DeadlineMiss = namedtuple("DeadlineMiss", "time tid deadline")
+ModeSwitch = namedtuple("ModeSwitch", "time old new")
+
+EVENT_TYPES = (Release, Dispatch, Preempt, Complete, DeadlineMiss, ModeSwitch)
+
+# Scheduler created (only written to traces, see tracefile.py)
+Start = namedtuple("Start", "time mode")
+
+
+# ---------- Streaming consumers ----------
+# Each one takes an iterable of events and either passes them on (so they
+# can be chained) or consumes them, holding only constant state.
+
+def only(events, *types):
+    """
+    Pass on only the events of the given types.
+    """
+    for event in events:
+        if isinstance(event, types):
+            yield event
+
+
+def counted(events, counts):
+    """
+    Pass events on unchanged while counting them per type name
+    in the dict 'counts'.
+    """
+    for event in events:
+        name = type(event).__name__
+        counts[name] = counts.get(name, 0) + 1
+        yield event
+
+
+def write_csv(events, fp):
+    """
+    Write events as CSV rows (time, event, tid/fields...) to an open file.
+    Returns the number of events written.
+    """
+    writer = csv.writer(fp)
+    writer.writerow(["time", "event", "fields"])
+    n = 0
+    for event in events:
+        writer.writerow([event.time, type(event).__name__, *event[1:]])
+        n += 1
+    return n
+
+
+def busy_time(events):
+    """
+    Time units each task ran, from Dispatch / Preempt / Complete /
+    DeadlineMiss events. Returns {tid: time units}.
+    """
+    totals = {}
+    running, since = None, 0
+    for event in events:
+        if isinstance(event, Dispatch):
+            if running is not None:
+                totals[running] = totals.get(running, 0) + event.time - since
+            running, since = event.tid, event.time
+        elif isinstance(event, (Preempt, Complete)) and event.tid == running:
+            totals[running] = totals.get(running, 0) + event.time - since
+            running = None
+        elif isinstance(event, DeadlineMiss) and event.tid == running:
+            totals[running] = totals.get(running, 0) + event.time - since
+            running = None
+    return totals
@@ -0,0 +1,380 @@
+# loader.py
+
+import csv
+import io
+import json
+import os
+from array import array
+from operator import le, lt
+
+from task_model import TaskSet
+
+# file formats, by extension
+FORMATS = {".csv": "csv", ".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+FIELDS = ("tid", "period", "exec_time", "deadline")
+
+# bytes read at a time from a JSON file
+_JSON_CHUNK = 1 << 16
+
+# longest JSON record (in characters) tried before giving up on it as
+# bad JSON; a task record is a few dozen characters
+_MAX_RECORD = 1 << 20
+
+# records read and checked together
+_BATCH = 4096
+
+# how error messages name a position in a file
+_LINE = "{}:{}"
+_RECORD = "{}: record {}"
+
+# raw value types the batch check converts with int() directly
+_PLAIN = {int, str}
+
+# largest values the TaskSet arrays hold (tid is 64-bit, times 32-bit)
+_MAX_TID = 2 ** 63 - 1
+_MAX_TIME = 2 ** 31 - 1
+
+
+def _int(value, field, where):
+    # a whole number (int, or a string / float with an integral value)
+    if type(value) is int:
+        return value
+    if type(value) is str:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    if isinstance(value, bool):
+        raise ValueError(f"{where}: {field} must be an integer, got {value!r}")
+    if isinstance(value, int):
+        return int(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: {field} must be an integer, got {value!r}") from None
+    if not number.is_integer():
+        raise ValueError(f"{where}: {field} must be an integer, got {value!r}")
+    return int(number)
+
+
+def _is_number(cell):
+    # a CSV cell that reads as a number (so its row is data, not a header)
+    try:
+        float(cell)
+    except ValueError:
+        return False
+    return True
+
+
+def validate(tid, period, exec_time, deadline=None, where="task"):
+    """
+    Check one task definition and return it as a (tid, period, exec_time,
+    deadline) tuple of ints (deadline defaults to the period).
+    Raises ValueError naming 'where' (e.g. "tasks.csv:12") on bad input:
+    non-integers, period / exec_time / deadline below 1, a deadline past
+    the period, an exec_time longer than the deadline, or values too
+    large for a TaskSet.
+    """
+    tid = _int(tid, "tid", where)
+    period = _int(period, "period", where)
+    exec_time = _int(exec_time, "exec_time", where)
+    deadline = period if deadline is None or deadline == "" else _int(deadline, "deadline", where)
+    # 1. the usual case: everything fine
+    if 1 <= exec_time <= deadline <= period <= _MAX_TIME and -_MAX_TID - 1 <= tid <= _MAX_TID:
+        return tid, period, exec_time, deadline
+    # 2. find the first problem
+    if not -_MAX_TID - 1 <= tid <= _MAX_TID:
+        raise ValueError(f"{where}: tid {tid} does not fit in 64 bits")
+    if period > _MAX_TIME:
+        raise ValueError(f"{where}: period must be at most {_MAX_TIME}, got {period}")
+    if period < 1:
+        raise ValueError(f"{where}: period must be at least 1, got {period}")
+    if exec_time < 1:
+        raise ValueError(f"{where}: exec_time must be at least 1, got {exec_time}")
+    if not 1 <= deadline <= period:
+        raise ValueError(f"{where}: deadline must be in 1..period ({period}), got {deadline}")
+    raise ValueError(f"{where}: exec_time {exec_time} is longer than the deadline {deadline}")
+
+
+def _fields(record, label, name, number):
+    # raw [tid, period, exec_time, deadline] of a JSON record: an object
+    # with the FIELDS names, or a list in FIELDS order
+    if type(record) is dict:
+        try:
+            values = [record["tid"], record["period"], record["exec_time"], record.get("deadline")]
+        except KeyError as missing:
+            raise ValueError(f"{label.format(name, number)}: missing field {missing}") from None
+        if len(record) > 3 + ("deadline" in record):
+            unknown = sorted(set(record) - set(FIELDS))
+            raise ValueError(f"{label.format(name, number)}: unknown field(s) {', '.join(unknown)}")
+        return values
+    if type(record) is list and 3 <= len(record) <= 4:
+        return record if len(record) == 4 else record + [None]
+    raise ValueError(f"{label.format(name, number)}: expected an object or a "
+                     "[tid, period, exec_time(, deadline)] list")
+
+
+def _csv_batches(f, name):
+    reader = csv.reader(f)
+    columns = None  # column number of each field (None: not in the file)
+    headerless = False
+    rows, numbers = [], []
+    for row in reader:
+        if not row or row[0].lstrip().startswith("#"):
+            continue
+        if columns is None:
+            if row[0].strip() and not _is_number(row[0]):
+                # header row: the columns may come in any order (a first
+                # cell like "1.5" or "" is bad data, left to the value checks)
+                names = [cell.strip().lower() for cell in row]
+                missing = [field for field in FIELDS[:3] if field not in names]
+                if missing:
+                    raise ValueError(f"{name}:{reader.line_num}: header lacks {', '.join(missing)}")
+                columns = [names.index(field) if field in names else None for field in FIELDS]
+                continue
+            columns = [0, 1, 2, 3]
+            headerless = True
+        if columns[3] == 3 and len(row) == 4:
+            rows.append(row)
+        else:
+            if headerless and len(row) > 4:
+                raise ValueError(f"{name}:{reader.line_num}: expected at most 4 columns, "
+                                 f"got {len(row)}")
+            values = [row[k] if k is not None and k < len(row) else None for k in columns]
+            if None in values[:3]:
+                raise ValueError(f"{name}:{reader.line_num}: expected tid, period and exec_time, "
+                                 f"got {len(row)} column(s)")
+            rows.append(values)
+        numbers.append(reader.line_num)
+        if len(rows) == _BATCH:
+            yield rows, numbers
+            rows, numbers = [], []
+    if rows:
+        yield rows, numbers
+
+
+def _jsonl_batches(f, name):
+    lines, numbers = [], []
+    for number, line in enumerate(f, 1):
+        if line.isspace() or not line:
+            continue
+        lines.append(line)
+        numbers.append(number)
+        if len(lines) == _BATCH:
+            yield _jsonl_rows(lines, numbers, name), numbers
+            lines, numbers = [], []
+    if lines:
+        yield _jsonl_rows(lines, numbers, name), numbers
+
+
+def _jsonl_rows(lines, numbers, name):
+    # decode the lines as one JSON array (one parser call per batch);
+    # line by line only to find a bad line
+    try:
+        records = json.loads("[" + ",".join(lines) + "]")
+    except json.JSONDecodeError:
+        records = None
+    if records is None or len(records) != len(lines):
+        records = []
+        for line, number in zip(lines, numbers):
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{name}:{number}: bad JSON: {e.msg}") from None
+    return [_fields(record, _LINE, name, number) for record, number in zip(records, numbers)]
+
+
+def _json_records(f, name):
+    """
+    Records of a top-level JSON array, decoded one at a time from a
+    sliding buffer, so only the current part of the file is in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    base = 0  # characters of the file before buf
+    eof = False
+
+    def fill():
+        # read more; returns False at the end of the file
+        nonlocal buf, pos, base, eof
+        chunk = f.read(_JSON_CHUNK)
+        buf = buf[pos:] + chunk
+        base += pos
+        pos = 0
+        eof = not chunk
+        return bool(chunk)
+
+    def skip_space():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    skip_space()
+    if buf[pos:pos + 1] != "[":
+        raise ValueError(f"{name}: expected a JSON array of tasks")
+    pos += 1
+    count = 0
+    while True:
+        skip_space()
+        if buf[pos:pos + 1] == "]":
+            return
+        if count:
+            if buf[pos:pos + 1] != ",":
+                raise ValueError(f"{name}: record {count}: expected ',' or ']'")
+            pos += 1
+            skip_space()
+        while True:
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+                break
+            except json.JSONDecodeError as e:
+                # most likely the record is cut off at the end of the buffer;
+                # past _MAX_RECORD it is bad JSON (do not read on to the end)
+                at = base + e.pos  # before fill() moves the buffer
+                if eof or len(buf) - pos >= _MAX_RECORD or not fill():
+                    raise ValueError(f"{name}: record {count + 1}: bad JSON at character "
+                                     f"{at}: {e.msg}") from None
+        pos = end
+        count += 1
+        yield record
+
+
+def _json_batches(f, name):
+    rows, numbers = [], []
+    for number, record in enumerate(_json_records(f, name), 1):
+        rows.append(_fields(record, _RECORD, name, number))
+        numbers.append(number)
+        if len(rows) == _BATCH:
+            yield rows, numbers
+            rows, numbers = [], []
+    if rows:
+        yield rows, numbers
+
+
+def _check(rows, wheres):
+    """
+    Validate a batch of raw rows; returns its (tids, periods, exec_times,
+    deadlines) columns as lists of ints. 'wheres' gives the position of
+    each row for error messages (only looked at when there is an error).
+    """
+    # 1. fast path: convert and check whole columns at once
+    tids, periods, exec_times, deadlines = zip(*rows)
+    if set(map(type, tids + periods + exec_times)) <= _PLAIN:
+        try:
+            tids = list(map(int, tids))
+            periods = list(map(int, periods))
+            exec_times = list(map(int, exec_times))
+            if None in deadlines or "" in deadlines:
+                deadlines = [p if d is None or d == "" else d for p, d in zip(periods, deadlines)]
+            if set(map(type, deadlines)) <= _PLAIN:
+                deadlines = list(map(int, deadlines))
+                if (min(exec_times) >= 1 and max(periods) <= _MAX_TIME
+                        and -_MAX_TID - 1 <= min(tids) and max(tids) <= _MAX_TID
+                        and all(map(le, exec_times, deadlines)) and all(map(le, deadlines, periods))):
+                    return tids, periods, exec_times, deadlines
+        except ValueError:
+            pass
+    # 2. something is off: go row by row, for the exact message
+    checked = [validate(*row, where=where) for row, where in zip(rows, wheres)]
+    return tuple(map(list, zip(*checked)))
+
+
+class _Positions:
+    # "file:line" labels of a batch, made only when iterated (on errors)
+
+    def __init__(self, label, name, numbers):
+        self.label = label
+        self.name = name
+        self.numbers = numbers
+
+    def __iter__(self):
+        return (self.label.format(self.name, number) for number in self.numbers)
+
+
+def _batches(source, fmt):
+    # (columns, positions) of each batch of validated tasks
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "<file>")
+    if fmt is None:
+        fmt = FORMATS.get(os.path.splitext(str(name))[1].lower())
+        if fmt is None:
+            known = ", ".join(sorted(set(FORMATS.values())))
+            raise ValueError(f"{name}: unknown task file format (use {known})")
+    if fmt not in FORMATS.values():
+        raise ValueError(f"unknown task file format: {fmt}")
+    reader = {"csv": _csv_batches, "json": _json_batches, "jsonl": _jsonl_batches}[fmt]
+    label = _RECORD if fmt == "json" else _LINE
+
+    opened = isinstance(source, (str, os.PathLike))
+    if opened:
+        f = open(source, newline="", encoding="utf-8")
+    elif isinstance(source, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(source, "mode", ""):
+        f = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    else:
+        f = source
+    try:
+        for rows, numbers in reader(f, name):
+            positions = _Positions(label, name, numbers)
+            yield _check(rows, positions), positions
+    finally:
+        # close a file opened here; leave the caller's own file open
+        if opened:
+            f.close()
+        elif f is not source:
+            f.detach()
+
+
+def iter_task_specs(source, fmt=None):
+    """
+    Stream validated (tid, period, exec_time, deadline) tuples from a
+    task file.
+
+    source: a path, or an open file (text or binary; e.g. an upload)
+    fmt: "csv", "json" or "jsonl" (default: from the file extension)
+
+    CSV: rows "tid,period,exec_time[,deadline]", or any column order
+    under a header row naming them; '#' lines are comments.
+    JSON: one top-level array of {"tid", "period", "exec_time",
+    "deadline"} objects (deadline optional) or [tid, period, exec_time]
+    lists. JSONL: one such object or list per line.
+    Raises ValueError with the file position of the first bad record.
+    """
+    for columns, _ in _batches(source, fmt):
+        yield from zip(*columns)
+
+
+def load_tasks(source, fmt=None):
+    """
+    Load a task file (see iter_task_specs) into a new TaskSet.
+
+    The file is read and checked in batches of a few thousand records
+    that go straight into the TaskSet's typed arrays, so memory stays at
+    the ~52 bytes per task the TaskSet itself needs. Task ids must be
+    unique; this is checked in constant memory while they come in
+    increasing order (the usual case), with a set only once they do not.
+    """
+    taskset = TaskSet()
+    columns = (taskset.tid, taskset.period, taskset.exec_time, taskset.deadline)
+    seen = None   # set of tids, once they stop increasing
+    for batch, positions in _batches(source, fmt):
+        tids = batch[0]
+        if seen is None and not (
+                (not taskset.tid or taskset.tid[-1] < tids[0]) and all(map(lt, tids, tids[1:]))):
+            seen = set(taskset.tid)
+        if seen is not None:
+            new = set(tids)
+            if len(new) != len(tids) or not seen.isdisjoint(new):
+                for tid, where in zip(tids, positions):
+                    if tid in seen:
+                        raise ValueError(f"{where}: duplicate task id {tid}")
+                    seen.add(tid)
+            seen |= new
+        for column, values in zip(columns, batch):
+            column.extend(values)
+    for name, code in TaskSet.FIELDS[4:]:
+        getattr(taskset, name).extend(array(code, [0]) * len(taskset.tid))
+    return taskset
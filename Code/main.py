@@ -1,42 +1,309 @@
-from visualization import plot_timeline
-from task_model import Task
-from scheduler import AdaptiveScheduler
-
-// that site 4
-//that site
-def main():
-    # Heavier tasks to cause overload and deadline misses
-    tasks = [
-        Task(tid=1, period=10, exec_time=8),
-        Task(tid=2, period=15, exec_time=7),
-        Task(tid=3, period=20, exec_time=10),
-    ]
-// that site
-    # Start in RM; scheduler may switch to EDF automatically
-    scheduler = AdaptiveScheduler(tasks, mode="RM")
-
-    SIM_TIME = 200  # total time units to simulate
-    timeline = []   # which task ran at each time unit
-// that site
-    for _ in range(SIM_TIME):
-        running_tid = scheduler.step()
-        timeline.append(running_tid)
-
-    # Print basic results
-    print("=== Simulation finished ===")
-    print("Timeline (task ID at each time unit):")
-    print(timeline)
-
-    print("\nTask statistics:")
-    for t in tasks:
-        print(
-            f"Task {t.tid}: "
-            f"completed={t.completed_instances}, "
-            f"missed_deadlines={t.missed_deadlines}"
-        )
-
-    plot_timeline(timeline)
-if __name__ == "__main__":
-
-    main()
-
+# main.py
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from cache import ResultCache, cached_simulation, default_cache, default_cache_dir
+from loader import load_tasks, validate
+from policies import POLICIES
+from simulation import MODES
+from sweep import iter_sweep
+
+# Heavier tasks to cause overload and deadline misses (used when no
+# task file is given)
+DEMO_TASKS = [(1, 10, 8), (2, 15, 7), (3, 20, 10)]
+
+ENGINES = ("event", "tick", "cycle")
+
+# columns of the metrics output, in order
+METRICS = (
+    "index", "mode", "engine", "sim_time", "window_size", "switch_threshold",
+    "switch_back_threshold", "min_dwell", "policies", "n_tasks", "utilization",
+    "completed", "missed", "final_mode", "switch_time", "switches", "fast_path",
+    "response_p50", "response_p99", "response_max", "lateness_p99", "lateness_max",
+    "tardy", "start_jitter", "finish_jitter",
+)
+
+# METRICS columns taken from the per-job metrics: (column, path in
+# result["jobs"]["total"])
+JOB_COLUMNS = (
+    ("response_p50", ("response", "p50")),
+    ("response_p99", ("response", "p99")),
+    ("response_max", ("response", "max")),
+    ("lateness_p99", ("lateness", "p99")),
+    ("lateness_max", ("lateness", "max")),
+    ("tardy", ("tardy",)),
+    ("start_jitter", ("start_jitter",)),
+    ("finish_jitter", ("finish_jitter",)),
+)
+
+# settings a batch entry may set (the rest of the config comes from
+# its tasks); "horizon" is accepted for "sim_time"
+SETTINGS = ("mode", "engine", "sim_time", "window_size", "switch_threshold",
+            "switch_back_threshold", "min_dwell", "policies")
+TASK_KEYS = ("tasks", "tids", "periods", "exec_times", "deadlines")
+
+LATENESS_NOTE = (
+    "Lateness is finish - absolute deadline; 'tardy' counts the completed jobs with "
+    "lateness > 0. A job is only dropped as missed once time passes its deadline, so "
+    "a job finishing at deadline + 1 is completed (not missed) yet tardy with lateness 1."
+)
+
+
+def task_columns(tasks):
+    """
+    Task config entries (tids, periods, exec_times, deadlines lists, task
+    count and utilization) from a TaskSet or (tid, period, exec_time[,
+    deadline]) specs.
+    """
+    if hasattr(tasks, "period"):
+        columns = [list(tasks.tid), list(tasks.period), list(tasks.exec_time), list(tasks.deadline)]
+    else:
+        specs = [validate(*spec, where=f"task {k}") for k, spec in enumerate(tasks, 1)]
+        columns = [list(column) for column in zip(*specs)] or [[], [], [], []]
+    tids, periods, exec_times, deadlines = columns
+    return {
+        "tids": tids,
+        "periods": periods,
+        "exec_times": exec_times,
+        "deadlines": deadlines,
+        "n_tasks": len(tids),
+        "utilization": round(sum(e / p for e, p in zip(exec_times, periods)), 6),
+    }
+
+
+def base_settings(args):
+    """
+    Simulation settings given on the command line.
+    """
+    return {
+        "mode": args.mode,
+        "engine": args.engine,
+        "sim_time": args.horizon,
+        "window_size": args.window,
+        "switch_threshold": args.threshold,
+        "switch_back_threshold": args.switch_back,
+        "min_dwell": args.min_dwell,
+        "policies": tuple(args.policies) if args.policies else None,
+        "job_metrics": True,
+    }
+
+
+def batch_configs(path, defaults):
+    """
+    Configs of a batch file: a JSON array (or JSONL, one per line) of
+    objects with the tasks as "tasks" (a task file, relative to the batch
+    file, or a list of [tid, period, exec_time(, deadline)]) or as
+    "periods" / "exec_times" (/ "deadlines" / "tids") lists, plus any of
+    SETTINGS to override the command-line defaults.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a list of configs")
+
+    configs = []
+    for index, entry in enumerate(entries):
+        where = f"{path}: config {index + 1}"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: expected an object")
+        entry = dict(entry)
+        if "horizon" in entry:
+            entry["sim_time"] = entry.pop("horizon")
+        unknown = set(entry) - set(SETTINGS) - set(TASK_KEYS)
+        if unknown:
+            raise ValueError(f"{where}: unknown key(s) {', '.join(sorted(unknown))}")
+
+        # 1. the tasks
+        tasks = entry.pop("tasks", None)
+        if isinstance(tasks, str):
+            tasks = load_tasks(os.path.join(os.path.dirname(path), tasks))
+        elif tasks is None:
+            if "periods" not in entry or "exec_times" not in entry:
+                raise ValueError(f"{where}: give 'tasks' or 'periods' and 'exec_times'")
+            n = len(entry["periods"])
+            tasks = zip(entry.pop("tids", range(1, n + 1)), entry.pop("periods"),
+                        entry.pop("exec_times"), entry.pop("deadlines", [None] * n))
+        try:
+            config = task_columns(tasks)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{where}: {e}") from None
+
+        # 2. the settings
+        config.update(defaults)
+        config.update(entry)
+        if config["policies"] is not None:
+            config["policies"] = tuple(config["policies"])
+        config["index"] = index
+        configs.append(config)
+    return configs
+
+
+def metrics(row, per_task=False):
+    """
+    The METRICS of a result row; with 'per_task', plus the per-task job
+    metrics as "tasks" (JSON output only).
+    """
+    out = {name: row.get(name) for name in METRICS}
+    if out["policies"] is not None:
+        out["policies"] = "/".join(out["policies"])
+    jobs = row.get("jobs")
+    if jobs is not None:
+        for name, path in JOB_COLUMNS:
+            value = jobs["total"]
+            for key in path:
+                value = value[key]
+            out[name] = value
+        if per_task:
+            out["tasks"] = jobs["tasks"]
+    return out
+
+
+def run_configs(configs, args):
+    """
+    Metrics rows of the configs (in config order), run in 'workers'
+    processes through the shared result cache.
+    """
+    cache_dir = None if args.no_cache else default_cache_dir()
+    rows = [metrics(row, args.per_task)
+            for row in iter_sweep(configs, args.workers or None, cache_dir=cache_dir)]
+    rows.sort(key=lambda row: row["index"])
+    return rows
+
+
+def write_rows(rows, fmt, out, single=False):
+    """
+    Write metrics rows as JSON (one object if 'single') or CSV.
+    """
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=METRICS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        json.dump(rows[0] if single else rows, out, indent=2)
+        out.write("\n")
+
+
+def cmd_run(args, tasks):
+    config = task_columns(tasks)
+    config.update(base_settings(args), index=0)
+    plotting = args.plot is not None or args.show
+
+    # in-process, so the timeline (when plotting) comes back too
+    cache = ResultCache() if args.no_cache else default_cache()
+    specs = list(zip(config["tids"], config["periods"], config["exec_times"], config["deadlines"]))
+    cached = cached_simulation(
+        specs, config["mode"], config["sim_time"], config["window_size"],
+        config["switch_threshold"], with_timeline=plotting, engine=config["engine"],
+        cache=cache, switch_back_threshold=config["switch_back_threshold"],
+        min_dwell=config["min_dwell"], policies=config["policies"], job_metrics=True,
+    )
+    row = dict(config)
+    row.update(cached["result"])
+
+    if plotting:
+        # the only place matplotlib gets imported
+        from visualization import plot_timeline, save_gantt
+
+        title = f"{config['mode']} schedule"
+        if args.plot is not None:
+            save_gantt(cached["timeline"], args.plot, title)
+        if args.show:
+            plot_timeline(cached["timeline"])
+    return [metrics(row, args.per_task)]
+
+
+def cmd_compare(args, tasks):
+    columns = task_columns(tasks)
+    configs = []
+    for index, mode in enumerate(args.modes):
+        config = dict(columns)
+        config.update(base_settings(args), mode=mode, index=index)
+        configs.append(config)
+    return run_configs(configs, args)
+
+
+def cmd_batch(args):
+    return run_configs(batch_configs(args.configs, base_settings(args)), args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulate real-time task sets and print their metrics as JSON or CSV",
+        epilog=LATENESS_NOTE,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    settings = argparse.ArgumentParser(add_help=False)
+    settings.add_argument("--mode", default="ADAPTIVE", choices=MODES + tuple(POLICIES))
+    settings.add_argument("--engine", default="event", choices=ENGINES)
+    settings.add_argument("--horizon", type=int, default=200, help="time units to simulate")
+    settings.add_argument("--window", type=int, default=50, help="miss look-back window")
+    settings.add_argument("--threshold", type=int, default=3,
+                          help="misses in the window that trigger the switch")
+    settings.add_argument("--switch-back", type=int, default=None,
+                          help="switch back at or below this many misses (default: never)")
+    settings.add_argument("--min-dwell", type=int, default=0,
+                          help="time units to stay in a mode after a switch")
+    settings.add_argument("--policies", nargs=2, metavar=("NORMAL", "FALLBACK"),
+                          choices=tuple(POLICIES), help="policies ADAPTIVE moves between")
+    settings.add_argument("--workers", type=int, default=1,
+                          help="worker processes (0 = one per core)")
+    settings.add_argument("--format", choices=("json", "csv"),
+                          help="output format (default: from --out, else json)")
+    settings.add_argument("--out", help="write the metrics here instead of stdout")
+    settings.add_argument("--no-cache", action="store_true", help="do not use the result cache")
+    settings.add_argument("--per-task", action="store_true",
+                          help="add each task's job metrics to the JSON output "
+                               "(lateness: see the note below)")
+
+    tasks = argparse.ArgumentParser(add_help=False)
+    tasks.add_argument("--tasks", help="task file (CSV, JSON or JSONL); default: a demo set")
+
+    run = commands.add_parser("run", parents=[settings, tasks], help="simulate one config",
+                              epilog=LATENESS_NOTE)
+    run.add_argument("--plot", metavar="PATH", help="save the Gantt chart (PNG, SVG, ...)")
+    run.add_argument("--show", action="store_true", help="show the Gantt chart in a window")
+
+    batch = commands.add_parser("batch", parents=[settings], help="simulate the configs in a file",
+                                epilog=LATENESS_NOTE)
+    batch.add_argument("configs", help="JSON / JSONL list of configs (see batch_configs)")
+
+    compare = commands.add_parser("compare", parents=[settings, tasks],
+                                  help="simulate one task set under several modes",
+                                  epilog=LATENESS_NOTE)
+    compare.add_argument("--modes", nargs="+", default=MODES, choices=MODES + tuple(POLICIES))
+
+    args = parser.parse_args(argv)
+    if args.policies and args.mode != "ADAPTIVE":
+        parser.error("--policies only applies to --mode ADAPTIVE")
+    fmt = args.format or ("csv" if args.out and args.out.endswith(".csv") else "json")
+    if args.per_task and fmt == "csv":
+        parser.error("--per-task needs JSON output")
+
+    try:
+        if args.command == "batch":
+            rows = cmd_batch(args)
+        else:
+            task_set = load_tasks(args.tasks) if args.tasks else DEMO_TASKS
+            rows = (cmd_run if args.command == "run" else cmd_compare)(args, task_set)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as out:
+            write_rows(rows, fmt, out, single=args.command == "run")
+    else:
+        write_rows(rows, fmt, sys.stdout, single=args.command == "run")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
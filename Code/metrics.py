@@ -0,0 +1,332 @@
+# metrics.py
+
+import math
+from array import array
+
+
+class LogHistogram:
+    """
+    Histogram of integer samples in a fixed amount of memory.
+
+    Values below 2**sub_bits get a bucket each; above that every power
+    of two is split into 2**sub_bits buckets, so a bucket is never wider
+    than 1/2**sub_bits of its values (12.5% at the default 3). The
+    bucket array only grows up to the largest value seen, and never
+    past ~64 * 2**sub_bits buckets whatever the number of samples.
+    Negative samples go into a mirrored set of buckets.
+    count, total, min and max are exact; quantiles are exact up to the
+    bucket width (the upper end of the bucket is reported, clamped to
+    [min, max]).
+    """
+
+    def __init__(self, sub_bits=3):
+        self.sub_bits = sub_bits
+        self.counts = array("q")    # buckets of the values >= 0
+        self.negative = array("q")  # buckets of -value for values < 0
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, value):
+        # bucket of a value >= 0
+        s = self.sub_bits
+        if value < 1 << s:
+            return value
+        shift = value.bit_length() - s - 1
+        return ((shift + 1) << s) + (value >> shift) - (1 << s)
+
+    def _upper(self, bucket):
+        # largest value of a bucket
+        s = self.sub_bits
+        if bucket < 1 << s:
+            return bucket
+        shift = (bucket >> s) - 1
+        mantissa = (bucket & ((1 << s) - 1)) + (1 << s)
+        return ((mantissa + 1) << shift) - 1
+
+    def _lower(self, bucket):
+        # smallest value of a bucket
+        s = self.sub_bits
+        if bucket < 1 << s:
+            return bucket
+        shift = (bucket >> s) - 1
+        return ((bucket & ((1 << s) - 1)) + (1 << s)) << shift
+
+    def add(self, value, times=1):
+        """
+        Record 'value' ('times' times).
+        """
+        if value >= 0:
+            counts, b = self.counts, self._bucket(value)
+        else:
+            counts, b = self.negative, self._bucket(-value)
+        if b >= len(counts):
+            counts.extend(array("q", [0]) * (b + 1 - len(counts)))
+        counts[b] += times
+        self.count += times
+        self.total += value * times
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        The value below which a fraction 'q' of the samples lie (None if
+        there are none).
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        # negative values first, the most negative first
+        for b in range(len(self.negative) - 1, -1, -1):
+            seen += self.negative[b]
+            if seen >= rank:
+                return min(self.max, max(self.min, -self._lower(b)))
+        for b, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.max, max(self.min, self._upper(b)))
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def merge(self, other):
+        """
+        Add all samples of another histogram (same sub_bits).
+        """
+        self.add_diff(other, None, 1)
+
+    def add_diff(self, newer, older, times):
+        """
+        Add 'times' copies of the samples 'newer' has beyond 'older' (an
+        earlier copy() of it; None = empty): for schedules that repeat.
+        min / max take in newer's.
+        """
+        if times <= 0:
+            return
+        for name in ("counts", "negative"):
+            mine, new = getattr(self, name), getattr(newer, name)
+            old = getattr(older, name) if older is not None else ()
+            if len(new) > len(mine):
+                mine.extend(array("q", [0]) * (len(new) - len(mine)))
+            for b in range(len(new)):
+                diff = new[b] - (old[b] if b < len(old) else 0)
+                if diff:
+                    mine[b] += times * diff
+        self.count += times * (newer.count - (older.count if older is not None else 0))
+        self.total += times * (newer.total - (older.total if older is not None else 0))
+        for value in (newer.min, newer.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def copy(self):
+        other = LogHistogram(self.sub_bits)
+        other.counts = array("q", self.counts)
+        other.negative = array("q", self.negative)
+        other.count, other.total, other.min, other.max = self.count, self.total, self.min, self.max
+        return other
+
+    def summary(self):
+        """
+        {"count", "mean", "p50", "p99", "min", "max"}
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class TaskJobStats:
+    """
+    Per-job metrics of one task, kept incrementally as its jobs finish:
+    response time (finish - release), lateness (finish - absolute
+    deadline; > 0 means tardy) and start delay (first run - release)
+    histograms, plus the finish jitter: the spread of the response
+    times, and the largest change between two consecutive jobs.
+
+    Note the offset against the miss counts: the simulator only drops a
+    job once time > its absolute deadline, so a job may still run in the
+    time unit starting at its deadline. Such a job finishes at deadline
+    + 1: it counts as completed (not missed) but has lateness 1 and is
+    tardy here. Lateness is never above 1 for a completed job.
+    """
+
+    def __init__(self, sub_bits=3):
+        self.response = LogHistogram(sub_bits)
+        self.lateness = LogHistogram(sub_bits)
+        self.start_delay = LogHistogram(sub_bits)
+        self.tardy = 0                # jobs with lateness > 0
+        self.first_response = None
+        self.last_response = None
+        self.max_response_change = 0  # relative finish jitter
+        # the first response after a copy(), for the copies waiting on it
+        self.next_response = None
+        self._waiting = []
+
+    def finished(self, response, lateness):
+        self.response.add(response)
+        self.lateness.add(lateness)
+        if lateness > 0:
+            self.tardy += 1
+        if self._waiting:
+            for snapshot in self._waiting:
+                snapshot.next_response = response
+            self._waiting = []
+        if self.last_response is not None:
+            self.max_response_change = max(self.max_response_change,
+                                           abs(response - self.last_response))
+        else:
+            self.first_response = response
+        self.last_response = response
+
+    def copy(self):
+        other = TaskJobStats.__new__(TaskJobStats)
+        other.response = self.response.copy()
+        other.lateness = self.lateness.copy()
+        other.start_delay = self.start_delay.copy()
+        other.tardy = self.tardy
+        other.first_response = self.first_response
+        other.last_response = self.last_response
+        other.max_response_change = self.max_response_change
+        other.next_response = None
+        other._waiting = []
+        self._waiting.append(other)
+        return other
+
+    def add_diff(self, newer, older, times):
+        """
+        Append 'times' copies of the jobs 'newer' has beyond 'older' (an
+        earlier copy() of it; None = from the start) after the jobs
+        recorded so far.
+        """
+        self.response.add_diff(newer.response, older.response if older else None, times)
+        self.lateness.add_diff(newer.lateness, older.lateness if older else None, times)
+        self.start_delay.add_diff(newer.start_delay, older.start_delay if older else None, times)
+        if times <= 0 or newer.response.count == (older.response.count if older else 0):
+            return
+        self.tardy += times * (newer.tardy - (older.tardy if older else 0))
+        first = older.next_response if older else newer.first_response
+        last = newer.last_response
+        changes = [newer.max_response_change]
+        if self.last_response is not None:
+            # where the recorded jobs meet the first copy
+            changes.append(abs(first - self.last_response))
+        if times > 1:
+            # where one copy meets the next
+            changes.append(abs(first - last))
+        self.max_response_change = max(self.max_response_change, *changes)
+        if self.first_response is None:
+            self.first_response = first
+        self.last_response = last
+
+    def summary(self):
+        response = self.response
+        return {
+            "jobs": response.count,
+            "response": response.summary(),
+            "lateness": self.lateness.summary(),
+            "start_delay": self.start_delay.summary(),
+            "tardy": self.tardy,
+            "start_jitter": (self.start_delay.max - self.start_delay.min
+                             if self.start_delay.count else None),
+            "finish_jitter": response.max - response.min if response.count else None,
+            "relative_finish_jitter": self.max_response_change,
+        }
+
+
+class JobMetrics:
+    """
+    Per-job metrics of every task of a scheduler, in O(1) memory per
+    task whatever the run length (see TaskJobStats, LogHistogram).
+
+    Attach with scheduler.metrics = JobMetrics(scheduler.taskset); the
+    scheduler then calls ran() every time it runs a job. Only jobs that
+    finish get a response time and lateness; jobs dropped at a deadline
+    miss are in the miss counts instead. (An aperiodic server's row
+    records nothing: its jobs are in its ResponseStats.)
+    """
+
+    def __init__(self, taskset, sub_bits=3):
+        self.taskset = taskset
+        self.sub_bits = sub_bits
+        self.tasks = [TaskJobStats(sub_bits) for _ in range(len(taskset))]
+
+    def ran(self, i, now, length):
+        """
+        Task i's job runs for 'length' time units from 'now' (called
+        before its work left is reduced).
+        """
+        ts = self.taskset
+        left = ts.remaining_time[i]
+        if left == ts.exec_time[i] or left == length:
+            release = ts.absolute_deadline[i] - ts.deadline[i]
+            stats = self.tasks[i]
+            if left == ts.exec_time[i]:
+                # first time this job runs
+                stats.start_delay.add(now - release)
+            if left == length:
+                finish = now + length
+                stats.finished(finish - release, finish - ts.absolute_deadline[i])
+
+    def snapshot(self):
+        """
+        Copy of the current state (for add_diff()).
+        """
+        return [stats.copy() for stats in self.tasks]
+
+    def add_diff(self, newer, older, times):
+        """
+        Add 'times' copies of the jobs recorded between the snapshots
+        'older' (None = the start) and 'newer'; used when a stretch of
+        schedule is known to repeat instead of being simulated.
+        """
+        for k, stats in enumerate(self.tasks):
+            stats.add_diff(newer[k], older[k] if older is not None else None, times)
+
+    def extrapolate(self, prefix, full):
+        """
+        The recorded jobs are those of one hyperperiod of a schedule that
+        restarts identically every hyperperiod, and 'prefix' a snapshot
+        taken part way into it. Make them those of 'full' hyperperiods
+        followed by that part (see simulation._run_hyperperiods).
+        """
+        for stats, head in zip(self.tasks, prefix):
+            period = stats.copy()
+            stats.add_diff(period, None, full - 1)
+            stats.add_diff(head, None, 1)
+
+    def totals(self):
+        """
+        One TaskJobStats-like summary over all tasks (histograms merged).
+        """
+        merged = TaskJobStats(self.sub_bits)
+        for stats in self.tasks:
+            merged.add_diff(stats, None, 1)
+        summary = merged.summary()
+        # jitter is a per-task notion: report the worst task
+        per_task = [stats.summary() for stats in self.tasks if stats.response.count]
+        for name in ("start_jitter", "finish_jitter", "relative_finish_jitter"):
+            values = [s[name] for s in per_task if s[name] is not None]
+            summary[name] = max(values) if values else None
+        return summary
+
+    def summary(self, per_task=True):
+        """
+        {"total": totals(), "tasks": {tid: TaskJobStats summary}}; the
+        per-task part only if per_task is True.
+        """
+        out = {"total": self.totals()}
+        if per_task:
+            out["tasks"] = {
+                self.taskset.tid[i]: stats.summary() for i, stats in enumerate(self.tasks)
+            }
+        return out
@@ -0,0 +1,382 @@
+# multicore.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import analysis
+from events import Complete, Dispatch, Preempt
+from policies import POLICIES
+from scheduler import AdaptiveScheduler
+from simulation import MODES, make_tasks, run_simulation
+from timeline import Timeline
+
+# bin-packing heuristics for partitioned scheduling
+HEURISTICS = ("first_fit", "worst_fit")
+
+# modes analysis.no_misses() has a test for
+_TESTED_MODES = ("RM_ONLY", "EDF_ONLY", "ADAPTIVE", "RM", "EDF")
+
+
+def _spec(task):
+    return (task.tid, task.period, task.exec_time, task.deadline)
+
+
+def _core_utilization(core):
+    return sum(t.exec_time / t.period for t in core)
+
+
+def _fits(core, mode):
+    # the schedulability test of 'mode', or U <= 1 for the policies
+    # without one (LLF, DM, FIFO, RR)
+    if mode in _TESTED_MODES:
+        return analysis.no_misses(core, mode)
+    return analysis.utilization_at_most_one(core)
+
+
+# ---------- Partitioned scheduling ----------
+
+def partition(tasks, cores, heuristic="first_fit", mode="EDF_ONLY"):
+    """
+    Assign tasks to 'cores' processors by bin packing, taking tasks in
+    order of decreasing utilization (first-fit / worst-fit decreasing).
+
+    A task fits on a core if the core's tasks plus this one pass the
+    schedulability test of 'mode' (analysis.no_misses). The policies
+    without a test (LLF, DM, FIFO, RR) only check that the core's
+    utilization stays <= 1, which does not rule out misses.
+    first_fit: the lowest-numbered core it fits on.
+    worst_fit: the least loaded core it fits on (spreads the load).
+    A task that fits nowhere goes to the least loaded core; its misses
+    then show up in that core's simulation.
+
+    Returns a list of 'cores' lists of tasks.
+    """
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"unknown heuristic: {heuristic}")
+    if cores < 1:
+        raise ValueError("need at least one core")
+
+    bins = [[] for _ in range(cores)]
+    order = sorted(tasks, key=lambda t: (-t.exec_time / t.period, t.tid))
+    for task in order:
+        fits = [c for c in range(cores) if _fits(bins[c] + [task], mode)]
+        if fits and heuristic == "first_fit":
+            choice = fits[0]
+        else:
+            choice = min(fits or range(cores), key=lambda c: (_core_utilization(bins[c]), c))
+        bins[choice].append(task)
+    return bins
+
+
+def _run_core(specs, mode, sim_time, window_size, switch_threshold,
+              switch_back_threshold, min_dwell, engine, with_timeline, policies=None):
+    # one core = an independent single-CPU simulation of its tasks
+    tasks = make_tasks(specs)
+    timeline = Timeline() if with_timeline else None
+    result = run_simulation(
+        tasks, mode, sim_time,
+        window_size=window_size, switch_threshold=switch_threshold,
+        switch_back_threshold=switch_back_threshold, min_dwell=min_dwell,
+        timeline=timeline, engine=engine, policies=policies,
+    )
+    return {
+        "result": result,
+        "tasks": [(t.tid, t.completed_instances, t.missed_deadlines) for t in tasks],
+        "timeline": timeline,
+    }
+
+
+def run_partitioned(tasks, cores, mode, sim_time, heuristic="first_fit",
+                    window_size=50, switch_threshold=3, engine="event",
+                    with_timeline=False, workers=None,
+                    switch_back_threshold=None, min_dwell=0, policies=None):
+    """
+    Partitioned multi-core simulation: tasks are assigned to cores once
+    (see partition()) and never migrate, so every core is an ordinary
+    single-CPU scheduler with its own ready queue and its own adaptation.
+    The cores are simulated in parallel worker processes.
+
+    tasks: list of Task objects (or a TaskSet); their statistics are
+        updated in place.
+    mode: "RM_ONLY", "EDF_ONLY", "ADAPTIVE" (per core) or a single
+        policy name (see run_simulation(), also for 'policies')
+    workers: number of processes (default: one per core, at most the
+        number of CPUs); 1 runs everything in this process.
+
+    Returns {"completed", "missed", "assignment": {tid: core},
+             "cores": [per-core dict]}; a per-core dict has the core
+    number, its tids and utilization, the run_simulation() totals
+    (completed, missed, final_mode, switch_time, switches, fast_path) and its
+    Timeline (or None).
+    """
+    if mode not in MODES and mode not in POLICIES:
+        raise ValueError(f"unknown mode: {mode}")
+
+    bins = partition(tasks, cores, heuristic, mode)
+    jobs = [
+        ([_spec(t) for t in core], mode, sim_time, window_size,
+         switch_threshold, switch_back_threshold, min_dwell, engine, with_timeline, policies)
+        for core in bins
+    ]
+
+    workers = workers or min(cores, os.cpu_count() or 1)
+    if workers == 1:
+        outputs = [_run_core(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_run_core, *zip(*jobs)))
+
+    # copy the statistics back to the caller's tasks
+    by_tid = {t.tid: t for t in tasks}
+    per_core = []
+    for c, (core, output) in enumerate(zip(bins, outputs)):
+        for tid, completed, missed in output["tasks"]:
+            by_tid[tid].completed_instances = completed
+            by_tid[tid].missed_deadlines = missed
+        stats = dict(output["result"])
+        stats.update(
+            core=c,
+            tids=[t.tid for t in core],
+            utilization=_core_utilization(core),
+            timeline=output["timeline"],
+        )
+        per_core.append(stats)
+
+    return {
+        "completed": sum(s["completed"] for s in per_core),
+        "missed": sum(s["missed"] for s in per_core),
+        "assignment": {tid: s["core"] for s in per_core for tid in s["tids"]},
+        "cores": per_core,
+    }
+
+
+# ---------- Global scheduling ----------
+
+class GlobalScheduler(AdaptiveScheduler):
+    """
+    Global multi-core scheduler: one ready queue shared by 'cores'
+    processors. Every time unit the 'cores' highest-priority jobs run
+    (global EDF in mode "EDF", global RM in mode "RM", and so on for the
+    other policies); a job may continue on a different core than before
+    (a migration).
+
+    Releases, deadline misses and the RM -> EDF adaptation work exactly
+    as in AdaptiveScheduler; with cores=1 the schedule is the same.
+    events() reports a Dispatch whenever a job starts on a core (also
+    after a migration) and a Preempt when a running job loses its core.
+    run_cyclic() is not available.
+    """
+
+    def __init__(self, tasks, cores, mode="EDF", telemetry=None, policies=None):
+        super().__init__(tasks, mode=mode, telemetry=telemetry, policies=policies)
+        if cores < 1:
+            raise ValueError("need at least one core")
+        self.cores = cores
+        self.job_core = {}           # task index -> core its current job last ran on
+        self.last_running = set()    # unfinished jobs that ran in the last time unit
+        self.migrations = 0
+        self.preemptions = 0
+        self.core_busy = [0] * cores
+        self.core_running = [None] * cores  # unfinished job that ran on each core
+        self._core_timelines = None  # per-core Timelines while run_until() fills them
+
+    def step(self):
+        """
+        Simulate one time unit on all cores.
+        Returns:
+            list with the tid running on each core (None = idle).
+        """
+        ts = self.taskset
+
+        # 1) Release new jobs if it's time
+        self._release_jobs()
+
+        # 2) Check for deadline misses (marked on the core the job last ran on)
+        for i in self._drop_missed_jobs():
+            core = self.job_core.pop(i, 0)
+            if self.core_running[core] == i:
+                self.core_running[core] = None
+            if self._core_timelines is not None:
+                self._core_timelines[core].mark_miss(ts.tid[i])
+
+        # 3) Adapt mode based on recent performance
+        self._update_mode_adaptively()
+
+        # 4) Pick the highest-priority jobs, one per core (taken out of the
+        #    policy one by one, then put back as they were)
+        picked = []
+        while len(picked) < self.cores:
+            i = self.policy.pop(self.time)
+            if i is None:
+                break
+            picked.append(i)
+        self.policy.putback(picked)
+        chosen = set(picked)
+        for i in self.last_running:
+            if i not in chosen and ts.remaining_time[i] > 0:
+                self.preemptions += 1
+
+        # 5) Place them: a job keeps the core it last ran on if that core
+        #    is free, the others take the free cores (a migration if the
+        #    job already ran somewhere else)
+        running = [None] * self.cores
+        waiting = []
+        for i in picked:
+            core = self.job_core.get(i)
+            if core is not None and running[core] is None:
+                running[core] = i
+            else:
+                waiting.append(i)
+        free = (c for c in range(self.cores) if running[c] is None)
+        for i, core in zip(waiting, free):
+            if i in self.job_core:
+                self.migrations += 1
+            self.job_core[i] = core
+            running[core] = i
+        if self._event_sink is not None:
+            self._core_events(running)
+
+        # 6) Run each for one time unit; it stays queued or completes
+        self.last_running = set()
+        self.core_running = [None] * self.cores
+        for core, i in enumerate(running):
+            if i is None:
+                continue
+            tid = ts.tid[i]
+            if self.metrics is not None:
+                self.metrics.ran(i, self.time, 1)
+            ts.remaining_time[i] -= 1
+            self.core_busy[core] += 1
+            self.telemetry.record_busy(self.time)
+            if self._run_trackers:
+                self._ran(i, 1)
+            if ts.remaining_time[i] > 0:
+                self.last_running.add(i)
+                self.core_running[core] = i
+            else:
+                ts.completed_instances[i] += 1
+                self.telemetry.record_completion(
+                    self.time, self.time + 1 - ts.absolute_deadline[i]
+                )
+                self._job_done(i)
+                del self.job_core[i]
+                if self._event_sink is not None:
+                    self._event_sink(Complete(self.time + 1, tid))
+
+        # 7) Advance time
+        self.time += 1
+        return [None if i is None else ts.tid[i] for i in running]
+
+    def _core_events(self, running):
+        """
+        Dispatch / Preempt events for the cores whose job changes now.
+        """
+        ts = self.taskset
+        placed = set(running)
+        for core, (previous, current) in enumerate(zip(self.core_running, running)):
+            if previous == current:
+                continue
+            if previous is not None and previous not in placed:
+                by = ts.tid[current] if current is not None else None
+                self._event_sink(Preempt(self.time, ts.tid[previous], by))
+            if current is not None:
+                self._event_sink(Dispatch(self.time, ts.tid[current]))
+
+    def _advance(self, until, timeline=None):
+        # no stretches to skip with several cores: always one step
+        self.step()
+
+    def run_cyclic(self, until, timeline=None):
+        """
+        Not available: the cycle fingerprint does not cover the cores
+        (which job runs where).
+        """
+        raise NotImplementedError("global scheduling has no cycle engine; use run_until()")
+
+    def run_until(self, until, timelines=None):
+        """
+        Simulate up to (but not including) time 'until'.
+        timelines: optional list of one Timeline per core.
+        """
+        self._core_timelines = timelines
+        try:
+            while self.time < until:
+                tids = self.step()
+                if timelines is not None:
+                    for timeline, tid in zip(timelines, tids):
+                        timeline.append(tid)
+        finally:
+            self._core_timelines = None
+
+
+def run_global(tasks, cores, mode, sim_time, window_size=50, switch_threshold=3,
+               with_timeline=False, switch_back_threshold=None, min_dwell=0,
+               policies=None):
+    """
+    Global multi-core simulation with migrations (see GlobalScheduler).
+
+    tasks: list of Task objects (or a TaskSet); their statistics are
+        updated in place.
+    mode: "EDF_ONLY" (global EDF), "RM_ONLY" (global RM) or "ADAPTIVE"
+        (global RM, switching to global EDF on misses, and back if
+        switch_back_threshold is set), or a single policy name (global
+        LLF, FIFO, ...).
+    policies: (normal, fallback) policies of ADAPTIVE (default RM, EDF).
+
+    Returns {"completed", "missed", "final_mode", "switch_time", "switches",
+             "migrations", "preemptions", "cores": [per-core dict]};
+    a per-core dict has the core number, its busy time and its
+    Timeline (or None).
+    """
+    if mode not in MODES and mode not in POLICIES:
+        raise ValueError(f"unknown mode: {mode}")
+
+    if mode == "ADAPTIVE":
+        policies = tuple(policies or ("RM", "EDF"))
+        start = policies[0]
+    elif mode in POLICIES:
+        policies = (mode, mode)
+        start = mode
+    else:
+        policies = ("RM", "EDF")
+        start = "EDF" if mode == "EDF_ONLY" else "RM"
+    scheduler = GlobalScheduler(tasks, cores, mode=start, policies=policies)
+    scheduler.window_size = window_size
+    scheduler.switch_threshold = switch_threshold
+    if mode != "ADAPTIVE":
+        scheduler.switch_threshold = 10**9
+    else:
+        scheduler.switch_back_threshold = switch_back_threshold
+        scheduler.min_dwell = min_dwell
+
+    timelines = [Timeline() for _ in range(cores)] if with_timeline else None
+    scheduler.run_until(sim_time, timelines)
+
+    ts = scheduler.taskset
+    return {
+        "completed": sum(ts.completed_instances),
+        "missed": sum(ts.missed_deadlines),
+        "final_mode": scheduler.mode,
+        "switch_time": scheduler.switch_time,
+        "switches": scheduler.switches,
+        "migrations": scheduler.migrations,
+        "preemptions": scheduler.preemptions,
+        "cores": [
+            {"core": c, "busy": scheduler.core_busy[c],
+             "timeline": timelines[c] if timelines is not None else None}
+            for c in range(cores)
+        ],
+    }
+
+
+if __name__ == "__main__":
+    specs = [(1, 10, 8), (2, 15, 7), (3, 20, 10), (4, 12, 3), (5, 30, 9)]
+    for heuristic in HEURISTICS:
+        result = run_partitioned(make_tasks(specs), 2, "ADAPTIVE", 200, heuristic)
+        print(heuristic, result["assignment"], result["completed"], result["missed"])
+        for core in result["cores"]:
+            print("  core", core["core"], core["tids"], round(core["utilization"], 2),
+                  core["completed"], core["missed"], core["final_mode"])
+    result = run_global(make_tasks(specs), 2, "EDF_ONLY", 200)
+    print("global EDF", result["completed"], result["missed"],
+          "migrations", result["migrations"], "preemptions", result["preemptions"])
@@ -0,0 +1,437 @@
+# policies.py
+
+import heapq
+from collections import deque
+
+
+class Policy:
+    """
+    A scheduling policy: decides which pending job runs next.
+
+    Each policy keeps the pending jobs in a structure of its own. The
+    scheduler reports releases (add) and the time a job ran (ran).
+    Jobs that finish or are dropped are not taken out: their entries go
+    stale (see live()) and are skipped when they come up.
+
+    A job is named by its task index i; 'stamp' is the job's absolute
+    deadline, which tells two jobs of the same task apart.
+    """
+
+    name = None
+
+    def __init__(self, taskset):
+        self.taskset = taskset
+
+    def live(self, i, stamp):
+        """
+        True if the job of task i with deadline 'stamp' is still pending.
+        """
+        ts = self.taskset
+        return ts.remaining_time[i] > 0 and ts.absolute_deadline[i] == stamp
+
+    def _too_stale(self, size):
+        # every task has at most one pending job, so past this size most
+        # entries are stale and a clean-out pays for itself
+        return size > 2 * len(self.taskset) + 32
+
+    def add(self, i):
+        """
+        Task i released a job.
+        """
+        raise NotImplementedError
+
+    def pick(self, now):
+        """
+        Index of the job to run at time 'now' (None if no job is
+        pending). The job stays in the structure.
+        """
+        raise NotImplementedError
+
+    def pop(self, now):
+        """
+        Like pick(), but also takes the job out (so the next pop() gives
+        the next job; the multi-core scheduler takes its top jobs out
+        this way).
+        """
+        raise NotImplementedError
+
+    def putback(self, jobs):
+        """
+        Undo pop() for the jobs in 'jobs' (in the order they were popped).
+        """
+        for i in jobs:
+            self.add(i)
+
+    def ran(self, i, length):
+        """
+        Job i just ran for 'length' time units.
+        """
+
+    def run_limit(self, i, now):
+        """
+        Time units the just picked job i may run before the policy could
+        pick another one, if no release, completion or miss happens
+        first. float('inf') for policies whose order only changes on
+        those events.
+        """
+        return float("inf")
+
+    def activate(self):
+        """
+        The policy becomes the active one (after a mode switch).
+        """
+
+    def shift(self, delta):
+        """
+        Move every stored time 'delta' time units ahead (see
+        AdaptiveScheduler._shift_time).
+        """
+        raise NotImplementedError
+
+    def state(self):
+        """
+        Decision state not already in the task arrays (for cycle
+        detection); () if there is none.
+        """
+        return ()
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class StaticPriorityPolicy(Policy):
+    """
+    Fixed task priorities: the tasks are sorted once by priority_key()
+    (ties by tid), and the ready jobs are kept in a heap of their
+    position (rank) in that static sorted list.
+    """
+
+    def __init__(self, taskset):
+        super().__init__(taskset)
+        order = sorted(range(len(taskset)), key=lambda i: (self.priority_key(i), taskset.tid[i]))
+        self.rank = [0] * len(taskset)
+        for position, i in enumerate(order):
+            self.rank[i] = position
+        self.heap = []  # (rank, task index, stamp)
+
+    def priority_key(self, i):
+        raise NotImplementedError
+
+    def add(self, i):
+        heapq.heappush(self.heap, (self.rank[i], i, self.taskset.absolute_deadline[i]))
+        if self._too_stale(len(self.heap)):
+            self.heap[:] = [e for e in self.heap if self.live(e[1], e[2])]
+            heapq.heapify(self.heap)
+
+    def _clean(self):
+        heap = self.heap
+        while heap and not self.live(heap[0][1], heap[0][2]):
+            heapq.heappop(heap)
+
+    def pick(self, now):
+        self._clean()
+        return self.heap[0][1] if self.heap else None
+
+    def pop(self, now):
+        self._clean()
+        return heapq.heappop(self.heap)[1] if self.heap else None
+
+    def shift(self, delta):
+        self.heap[:] = [(rank, i, stamp + delta) for rank, i, stamp in self.heap]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class RMPolicy(StaticPriorityPolicy):
+    """
+    Rate Monotonic: shorter period = higher priority.
+    """
+
+    name = "RM"
+
+    def priority_key(self, i):
+        return self.taskset.period[i]
+
+
+class DMPolicy(StaticPriorityPolicy):
+    """
+    Deadline Monotonic: shorter relative deadline = higher priority.
+    """
+
+    name = "DM"
+
+    def priority_key(self, i):
+        return self.taskset.deadline[i]
+
+
+class EDFPolicy(Policy):
+    """
+    Earliest Deadline First: a heap of (absolute deadline, tid) per job.
+    """
+
+    name = "EDF"
+
+    def __init__(self, taskset):
+        super().__init__(taskset)
+        self.heap = []  # (deadline, tid, task index)
+
+    def add(self, i):
+        ts = self.taskset
+        heapq.heappush(self.heap, (ts.absolute_deadline[i], ts.tid[i], i))
+        if self._too_stale(len(self.heap)):
+            self.heap[:] = [e for e in self.heap if self.live(e[2], e[0])]
+            heapq.heapify(self.heap)
+
+    def _clean(self):
+        heap = self.heap
+        while heap and not self.live(heap[0][2], heap[0][0]):
+            heapq.heappop(heap)
+
+    def pick(self, now):
+        self._clean()
+        return self.heap[0][2] if self.heap else None
+
+    def pop(self, now):
+        self._clean()
+        return heapq.heappop(self.heap)[2] if self.heap else None
+
+    def shift(self, delta):
+        self.heap[:] = [(d + delta, tid, i) for d, tid, i in self.heap]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class LLFPolicy(Policy):
+    """
+    Least Laxity First: smallest laxity (deadline - now - work left)
+    runs, ties by tid.
+
+    Laxities change every tick, but only relative to 'now': the key
+    deadline - work left stays fixed while a job waits and grows by one
+    per time unit it runs. So jobs are kept in integer buckets per key
+    (plus a heap of the keys in use), and only the running job is
+    re-filed, under its new key, when it has run.
+    """
+
+    name = "LLF"
+
+    def __init__(self, taskset):
+        super().__init__(taskset)
+        self.buckets = {}  # key -> list of (tid, task index, stamp)
+        self.keys = []     # heap of the keys that have a bucket
+        self.size = 0      # entries in all buckets, stale ones included
+
+    def _key(self, i):
+        return self.taskset.absolute_deadline[i] - self.taskset.remaining_time[i]
+
+    def _live_at(self, key, i, stamp):
+        # still pending and still filed under its current key
+        return self.live(i, stamp) and self._key(i) == key
+
+    def _insert(self, i):
+        ts = self.taskset
+        key = self._key(i)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = []
+            heapq.heappush(self.keys, key)
+        bucket.append((ts.tid[i], i, ts.absolute_deadline[i]))
+        self.size += 1
+        if self._too_stale(self.size):
+            self._rebuild(0)
+
+    def _rebuild(self, delta):
+        # move every time 'delta' ahead (the task arrays already are) and
+        # drop the stale entries
+        entries = [
+            (key + delta, tid, i, stamp + delta) for key, bucket in self.buckets.items()
+            for tid, i, stamp in bucket
+        ]
+        self.buckets = {}
+        for key, tid, i, stamp in entries:
+            if self._live_at(key, i, stamp):
+                self.buckets.setdefault(key, []).append((tid, i, stamp))
+        self.keys = list(self.buckets)
+        heapq.heapify(self.keys)
+        self.size = sum(len(bucket) for bucket in self.buckets.values())
+
+    def add(self, i):
+        self._insert(i)
+
+    def ran(self, i, length):
+        # its key grew by 'length'; the old entry is now stale
+        if self.taskset.remaining_time[i] > 0:
+            self._insert(i)
+
+    def _best(self):
+        # (key, position in bucket) of the highest-priority live entry
+        remaining = self.taskset.remaining_time
+        deadline = self.taskset.absolute_deadline
+        keys = self.keys
+        while keys:
+            key = keys[0]
+            bucket = self.buckets[key]
+            live = [
+                e for e in bucket
+                if remaining[e[1]] > 0 and deadline[e[1]] == e[2]
+                and deadline[e[1]] - remaining[e[1]] == key
+            ]
+            if len(live) == 1 and len(bucket) == 1:
+                return key, 0
+            self.size -= len(bucket) - len(live)
+            if live:
+                bucket[:] = live
+                return key, min(range(len(live)), key=lambda k: live[k][0])
+            del self.buckets[key]
+            heapq.heappop(keys)
+        return None
+
+    def pick(self, now):
+        best = self._best()
+        if best is None:
+            return None
+        key, k = best
+        return self.buckets[key][k][1]
+
+    def pop(self, now):
+        best = self._best()
+        if best is None:
+            return None
+        key, k = best
+        self.size -= 1
+        return self.buckets[key].pop(k)[1]
+
+    def run_limit(self, i, now):
+        # job i keeps the lead until its key catches up with the next
+        # bucket (or at once if another job shares its bucket); a stale
+        # next bucket only makes this shorter than needed, never longer
+        key = self._key(i)
+        if len(self.buckets.get(key, ())) > 1:
+            return 1
+        following = [k for k in self.keys[1:3] if k != key]
+        if not following:
+            return float("inf")
+        return max(1, min(following) - key)
+
+    def shift(self, delta):
+        self._rebuild(delta)
+
+    def __len__(self):
+        return self.size
+
+
+class FIFOPolicy(Policy):
+    """
+    First In First Out: jobs run to completion in release order (ties
+    by tid); a deque of jobs.
+    """
+
+    name = "FIFO"
+
+    def __init__(self, taskset):
+        super().__init__(taskset)
+        self.queue = deque()  # (task index, stamp)
+
+    def add(self, i):
+        self.queue.append((i, self.taskset.absolute_deadline[i]))
+        if self._too_stale(len(self.queue)):
+            self.queue = deque(e for e in self.queue if self.live(*e))
+
+    def _clean(self):
+        queue = self.queue
+        while queue and not self.live(*queue[0]):
+            queue.popleft()
+
+    def pick(self, now):
+        self._clean()
+        return self.queue[0][0] if self.queue else None
+
+    def pop(self, now):
+        self._clean()
+        return self.queue.popleft()[0] if self.queue else None
+
+    def putback(self, jobs):
+        ts = self.taskset
+        self.queue.extendleft((i, ts.absolute_deadline[i]) for i in reversed(jobs))
+
+    def shift(self, delta):
+        self.queue = deque((i, stamp + delta) for i, stamp in self.queue)
+
+    def __len__(self):
+        return len(self.queue)
+
+
+class RRPolicy(FIFOPolicy):
+    """
+    Round Robin: like FIFO, but the job at the front only runs for
+    'quantum' time units at a time before going to the back.
+    """
+
+    name = "RR"
+    quantum = 4
+
+    def __init__(self, taskset):
+        super().__init__(taskset)
+        self.used = 0  # time units the front job has run in its slice
+        self._popped_used = None  # 'used' while jobs are popped
+
+    def _clean(self):
+        queue = self.queue
+        while queue and not self.live(*queue[0]):
+            queue.popleft()
+            self.used = 0
+
+    def pick(self, now):
+        self._clean()
+        if self.used >= self.quantum and len(self.queue) > 1:
+            # slice used up: to the back of the queue
+            self.queue.append(self.queue.popleft())
+            self.used = 0
+            self._clean()
+        elif self.used >= self.quantum:
+            self.used = 0
+        return self.queue[0][0] if self.queue else None
+
+    def pop(self, now):
+        i = self.pick(now)
+        if i is not None:
+            self.queue.popleft()
+            # the next job down is not the front job yet: no slice of its own
+            if self._popped_used is None:
+                self._popped_used = self.used
+            self.used = 0
+        return i
+
+    def putback(self, jobs):
+        super().putback(jobs)
+        if self._popped_used is not None:
+            self.used = self._popped_used
+            self._popped_used = None
+
+    def ran(self, i, length):
+        if self.queue and self.queue[0] == (i, self.taskset.absolute_deadline[i]):
+            self.used += length
+
+    def run_limit(self, i, now):
+        return self.quantum - self.used
+
+    def activate(self):
+        self.used = 0
+
+    def state(self):
+        return (tuple(i for i, stamp in self.queue if self.live(i, stamp)), self.used)
+
+
+# registered policies, by mode name
+POLICIES = {cls.name: cls for cls in (RMPolicy, EDFPolicy, LLFPolicy, DMPolicy, FIFOPolicy, RRPolicy)}
+
+
+def make_policy(name, taskset):
+    """
+    New policy object of the registered policy 'name' for a TaskSet.
+    """
+    if name not in POLICIES:
+        raise ValueError(f"unknown policy: {name} (known: {', '.join(POLICIES)})")
+    return POLICIES[name](taskset)
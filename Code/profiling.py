@@ -0,0 +1,191 @@
+# profiling.py
+
+import time
+
+# scheduler methods that can be instrumented, and the phase name each
+# one is reported under. "step" on its own (without the phases it calls)
+# is the heap dispatch work of step(): phases 4-8.
+PHASES = {
+    "run_until": "run_until",
+    "run_cyclic": "run_cyclic",
+    "_advance": "advance",
+    "_next_event_time": "next_event",
+    "step": "step",
+    "_release_jobs": "release",
+    "_drop_missed_jobs": "deadline_check",
+    "_update_mode_adaptively": "adaptation",
+    "_switch_mode": "mode_switch",
+    "_dispatch": "dispatch",
+}
+
+
+class Observer:
+    """
+    Interface of a scheduler observer. Subclass it and override the
+    hooks you need; attach() it to a scheduler to get called.
+    """
+
+    def phase_start(self, phase, scheduler):
+        """
+        'phase' (a PHASES name) is about to run.
+        """
+
+    def phase_end(self, phase, scheduler, seconds):
+        """
+        'phase' finished after 'seconds' of wall time (including the
+        phases it called).
+        """
+
+    def preempted(self, scheduler, tid, by):
+        """
+        The unfinished job of task 'tid' was preempted by task 'by'.
+        """
+
+
+def _wrap(scheduler, name, observer):
+    method = getattr(scheduler, name)
+    phase = PHASES[name]
+    clock = time.perf_counter
+
+    if name == "_dispatch":
+        def wrapped(current):
+            previous = scheduler.running
+            observer.phase_start(phase, scheduler)
+            start = clock()
+            method(current)
+            observer.phase_end(phase, scheduler, clock() - start)
+            ts = scheduler.taskset
+            if previous is not None and previous != current and ts.remaining_time[previous] > 0:
+                observer.preempted(scheduler, ts.tid[previous], ts.tid[current])
+        return wrapped
+
+    def wrapped(*args, **kwargs):
+        observer.phase_start(phase, scheduler)
+        start = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            observer.phase_end(phase, scheduler, clock() - start)
+    return wrapped
+
+
+def attach(scheduler, observer):
+    """
+    Instrument one scheduler: its methods in PHASES are replaced, on this
+    instance only, by wrappers that report to 'observer'.
+
+    Nothing is checked or timed in the scheduler code itself, so a
+    scheduler without an observer runs exactly the same code as before
+    (no cost at all). Returns the scheduler.
+    """
+    detach(scheduler)
+    for name in PHASES:
+        if hasattr(scheduler, name):
+            setattr(scheduler, name, _wrap(scheduler, name, observer))
+    return scheduler
+
+
+def detach(scheduler):
+    """
+    Remove the instrumentation added by attach().
+    """
+    for name in PHASES:
+        scheduler.__dict__.pop(name, None)
+
+
+class Profiler(Observer):
+    """
+    Observer that records, per phase, the call count and wall time
+    (total, and "self" time without the phases it called), the heap
+    sizes after every simulated step and the number of preemptions.
+    Also keeps self time per call stack for flame graphs.
+    """
+
+    def __init__(self):
+        self.calls = {}         # phase -> number of calls
+        self.total_time = {}    # phase -> seconds, including called phases
+        self.self_time = {}     # phase -> seconds, excluding called phases
+        self.stacks = {}        # "a;b;c" call stack -> self seconds
+        self.preemptions = 0
+        # heap -> [samples, sum of sizes, max size]
+        self.heaps = {
+            "policy": [0, 0, 0],           # the current policy's ready structure
+            "release_calendar": [0, 0, 0],
+            "deadline_calendar": [0, 0, 0],
+        }
+        self._stack = []        # phases currently running
+        self._children = []     # per running phase: time spent in called phases
+
+    def phase_start(self, phase, scheduler):
+        self._stack.append(phase)
+        self._children.append(0.0)
+
+    def phase_end(self, phase, scheduler, seconds):
+        stack_key = ";".join(self._stack)
+        self._stack.pop()
+        own = seconds - self._children.pop()
+        if self._children:
+            self._children[-1] += seconds
+
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        self.total_time[phase] = self.total_time.get(phase, 0.0) + seconds
+        self.self_time[phase] = self.self_time.get(phase, 0.0) + own
+        self.stacks[stack_key] = self.stacks.get(stack_key, 0.0) + own
+
+        # sample the heaps once per move of the simulation
+        # (a step() inside advance is sampled by the advance)
+        if phase == "advance" or (phase == "step" and self._stack[-1:] != ["advance"]):
+            for name, stats in self.heaps.items():
+                size = len(getattr(scheduler, name))
+                stats[0] += 1
+                stats[1] += size
+                stats[2] = max(stats[2], size)
+
+    def preempted(self, scheduler, tid, by):
+        self.preemptions += 1
+
+    def summary(self):
+        """
+        {"phases": {phase: {"calls", "total_s", "self_s"}},
+         "heaps": {heap: {"mean", "max"}}, "preemptions": n}
+        """
+        return {
+            "phases": {
+                phase: {
+                    "calls": self.calls[phase],
+                    "total_s": self.total_time[phase],
+                    "self_s": self.self_time[phase],
+                }
+                for phase in self.calls
+            },
+            "heaps": {
+                name: {"mean": total / samples if samples else 0, "max": largest}
+                for name, (samples, total, largest) in self.heaps.items()
+            },
+            "preemptions": self.preemptions,
+        }
+
+    def report(self):
+        """
+        The summary as a text table, slowest phase (by self time) first.
+        """
+        lines = [f"{'phase':<20}{'calls':>12}{'total s':>12}{'self s':>12}{'us/call':>10}"]
+        for phase in sorted(self.calls, key=lambda p: -self.self_time[p]):
+            calls = self.calls[phase]
+            lines.append(
+                f"{phase:<20}{calls:>12,}{self.total_time[phase]:>12.4f}"
+                f"{self.self_time[phase]:>12.4f}{self.total_time[phase] / calls * 1e6:>10.2f}"
+            )
+        for name, stats in self.summary()["heaps"].items():
+            lines.append(f"{name:<20} mean size {stats['mean']:.1f}, max {stats['max']}")
+        lines.append(f"preemptions: {self.preemptions}")
+        return "\n".join(lines)
+
+    def write_folded(self, fp):
+        """
+        Write self time per call stack in the "folded stacks" format of
+        flamegraph.pl / speedscope / inferno: one "a;b;c <microseconds>"
+        line per stack, to an open text file.
+        """
+        for stack, seconds in sorted(self.stacks.items()):
+            fp.write(f"{stack} {round(seconds * 1e6)}\n")
@@ -1,129 +1,594 @@
-# scheduler.py
-
-import heapq
-from task_model import Task
-
-# that site
-class AdaptiveScheduler:
-    """
-    Adaptive real-time scheduler.
-    Starts with RM (Rate Monotonic) and can switch to EDF (Earliest Deadline First)
-    when too many deadlines are missed.
-    """
-
-    def __init__(self, tasks, mode="RM"):
-        self.tasks = tasks
-        self.time = 0
-        self.mode = mode  # "RM" or "EDF"
-        print("Scheduler started (log entry)")
-
-        # priority queue of (priority, tie_breaker, task)
-        self.ready_queue = []
-
-        # for adaptation
-        self.deadline_miss_history = []  # list of 0/1 per time step
-        self.window_size = 50            # look-back window
-        self.switch_threshold = 3        # if more than this misses in window -> switch to EDF
-
-    def _priority_key(self, task: Task):
-        """
-        How we decide which task has higher priority.
-        RM: shorter period = higher priority
-        EDF: earlier (smaller) absolute_deadline = higher priority
-        """
-        if self.mode == "RM":
-            return task.period
-        elif self.mode == "EDF":
-            return task.absolute_deadline
-        else:
-            return task.period
-#that site
-    def _rebuild_ready_queue(self):
-        """
-        Rebuild the priority queue when the mode changes (RM -> EDF).
-        This updates the priorities of all tasks already in the queue.
-        """
-        tmp = [item[2] for item in self.ready_queue]  # extract tasks
-        self.ready_queue.clear()
-        for t in tmp:
-            heapq.heappush(
-                self.ready_queue,
-                (self._priority_key(t), t.tid, t)
-            )
-
-    def _update_mode_adaptively(self):
-        """
-        Check recent deadline misses and possibly switch mode.
-        """
-        if len(self.deadline_miss_history) < self.window_size:
-            return
-
-        recent = self.deadline_miss_history[-self.window_size:]
-        misses_recent = sum(recent)
-
-        # Simple rule: if too many misses and we are in RM, switch to EDF
-        if misses_recent > self.switch_threshold and self.mode == "RM":
-            print(f"[t={self.time}] Too many misses ({misses_recent}) in last "
-                  f"{self.window_size} steps -> switching to EDF.")
-            self.mode = "EDF"
-            self._rebuild_ready_queue()
-# seconod id
-    def step(self):
-        """
-        Simulate one time unit.
-        Returns:
-            tid of the running task, or None if CPU is idle.
-        """
-
-        # 1) Release new jobs if it's time
-        for task in self.tasks:
-            if self.time >= task.next_release and task.remaining_time == 0:
-                task.release(self.time)
-                heapq.heappush(
-                    self.ready_queue,
-                    (self._priority_key(task), task.tid, task)
-                )
-
-        missed_this_step = 0
-
-        # 2) Check for deadline misses
-        for task in self.tasks:
-            if task.remaining_time > 0 and self.time > task.absolute_deadline:
-                task.missed_deadlines += 1
-                missed_this_step = 1
-                # Drop the job (it missed its deadline)
-                task.remaining_time = 0
-
-        self.deadline_miss_history.append(missed_this_step)
-
-        # 3) Adapt mode based on recent performance
-        self._update_mode_adaptively()
-
-        # 4) If no ready tasks, time just moves forward (CPU idle)
-        if not self.ready_queue:
-            self.time += 1
-            return None
-
-        # 5) Pick highest-priority task (according to current mode)
-        _, _, current = heapq.heappop(self.ready_queue)
-
-        # 6) Run it for one time unit
-        current.remaining_time -= 1
-
-        # 7) If it still has work, put it back into ready queue
-        if current.remaining_time > 0:
-            heapq.heappush(
-                self.ready_queue,
-                (self._priority_key(current), current.tid, current)
-            )
-        else:
-            # Job finished
-            current.completed_instances += 1
-
-        # 8) Advance time
-        self.time += 1
-
-
-        return current.tid
-
-
+# scheduler.py
+
+import heapq
+import math
+from policies import Policy, make_policy
+from task_model import TaskSet
+from timeline import Timeline
+from telemetry import Telemetry
+from events import Release, Dispatch, Preempt, Complete, DeadlineMiss, ModeSwitch, Start
+
+# that site
+class AdaptiveScheduler:
+    """
+    Adaptive real-time scheduler.
+    Starts with RM (Rate Monotonic) and can switch to EDF (Earliest Deadline First)
+    when too many deadlines are missed, and (if switch_back_threshold is
+    set) back to RM once the misses have died down.
+
+    Any two registered policies (policies.POLICIES: RM, EDF, LLF, DM,
+    FIFO, RR) can take those two roles: 'policies' is the pair
+    (normal, fallback). By default the normal policy is 'mode' and the
+    fallback is EDF (RM and EDF when starting in either of them).
+
+    'tasks' is a list of Task objects or a TaskSet. Either way the scheduler
+    works on the TaskSet arrays and refers to a task by its index in it.
+
+    'trace' is an optional tracefile.TraceWriter: the start, every scheduler
+    event and every mode switch are written to it (this replaces the
+    old log prints).
+    """
+
+    def __init__(self, tasks, mode="RM", telemetry=None, trace=None, policies=None):
+        self.tasks = tasks
+        # Task objects passed in become views of this set, so their
+        # statistics stay readable after the run
+        self.taskset = tasks if isinstance(tasks, TaskSet) else TaskSet.from_tasks(tasks)
+        self.time = 0
+        self.mode = mode  # name of the current policy
+
+        # the policies adaptation moves between
+        if policies is None:
+            policies = ("RM", "EDF") if mode in ("RM", "EDF") else (mode, "EDF")
+        if mode not in policies:
+            raise ValueError(f"mode {mode} is not one of the policies {policies}")
+        self.normal_mode, self.fallback_mode = policies
+
+        # Every policy in play keeps every pending job in its own ready
+        # structure, so a mode switch just makes the other one current.
+        # 'policy' is the one of the current mode. Jobs that finished or
+        # were dropped go stale in the structures and are skipped there.
+        self.policies = {name: make_policy(name, self.taskset) for name in dict.fromkeys(policies)}
+        self.policy = self.policies[mode]
+        # the policies that need to hear about every time unit run
+        self._run_trackers = [p for p in self.policies.values() if type(p).ran is not Policy.ran]
+        self.running = None  # index of the job that ran in the last time unit
+
+        # callback for scheduler events (the trace, and/or events() while
+        # it is iterating); None = nobody listens, so nothing is built
+        self.trace = trace
+        self._event_sink = None
+        if trace is not None:
+            self._event_sink = self._write_trace
+            self._write_trace(Start(self.time, self.mode))
+        # Timeline being filled by run_until(), which also gets the misses
+        self._timeline = None
+
+        # calendars, so a step only touches the tasks that are due:
+        #   release_calendar: (next_release, tid, index) for tasks waiting to be released
+        #   deadline_calendar: (absolute_deadline, tid, index) for released jobs
+        #   (entries of jobs that already finished are skipped when they come up)
+        ts = self.taskset
+        self.release_calendar = list(zip(ts.next_release, ts.tid, range(len(ts))))
+        heapq.heapify(self.release_calendar)
+        self.deadline_calendar = []
+
+        # for adaptation
+        # sliding-window counters (misses, miss rate, tardiness, utilization);
+        # the "miss_steps" window is the look-back window of the rule below
+        self.telemetry = telemetry if telemetry is not None else Telemetry()
+        self.switch_threshold = 3        # if more than this misses in window -> switch to EDF
+        self.switch_back_threshold = None  # if at most this many in EDF -> back to RM (None = never)
+        self.min_dwell = 0               # time units to stay in a mode before switching again
+        self.switch_time = None          # time of the first mode switch (None = no switch)
+        self.last_switch_time = None     # time of the latest mode switch
+        self.switches = 0                # number of mode switches
+
+        # optional per-job metrics (metrics.JobMetrics), told about every
+        # job run; None = not kept
+        self.metrics = None
+
+    def _write_trace(self, event):
+        self.trace.write(event, self.mode)
+
+    @property
+    def window_size(self):
+        """
+        Look-back window (time steps) of the adaptation rule.
+        """
+        return self.telemetry.window("miss_steps")
+
+    @window_size.setter
+    def window_size(self, size):
+        self.telemetry.set_window("miss_steps", size)
+
+#that site
+    def _queue_job(self, i):
+        """
+        Add task i's newly released job to every policy in play.
+        """
+        for policy in self.policies.values():
+            policy.add(i)
+
+    def _ran(self, i, length):
+        # job i ran for 'length' time units
+        for policy in self._run_trackers:
+            policy.ran(i, length)
+
+    def _pick(self):
+        """
+        Index of the job the current policy runs now, or None if no job
+        is pending.
+        """
+        return self.policy.pick(self.time)
+
+    def _job_done(self, i):
+        """
+        Task i's current job finished or was dropped:
+        put the task back on the release calendar.
+        """
+        heapq.heappush(
+            self.release_calendar,
+            (self.taskset.next_release[i], self.taskset.tid[i], i)
+        )
+
+    def _prune_deadline_calendar(self):
+        """
+        Discard deadline entries whose job is no longer pending.
+        """
+        calendar = self.deadline_calendar
+        ts = self.taskset
+        while calendar:
+            deadline, _, i = calendar[0]
+            if ts.remaining_time[i] > 0 and ts.absolute_deadline[i] == deadline:
+                return
+            heapq.heappop(calendar)
+
+    def _release_jobs(self):
+        """
+        Release every job that is due now.
+        """
+        ts = self.taskset
+        while self.release_calendar and self.release_calendar[0][0] <= self.time:
+            _, tid, i = heapq.heappop(self.release_calendar)
+            ts.release(i, self.time)
+            self._queue_job(i)
+            heapq.heappush(
+                self.deadline_calendar,
+                (ts.absolute_deadline[i], tid, i)
+            )
+            if self._event_sink is not None:
+                self._event_sink(Release(self.time, tid, ts.absolute_deadline[i]))
+
+    def _drop_missed_jobs(self):
+        """
+        Drop every pending job whose deadline has passed.
+        Returns the indices of the dropped jobs.
+        """
+        ts = self.taskset
+        dropped = []
+        self._prune_deadline_calendar()
+        while self.deadline_calendar and self.deadline_calendar[0][0] < self.time:
+            _, tid, i = heapq.heappop(self.deadline_calendar)
+            ts.missed_deadlines[i] += 1
+            if self._event_sink is not None:
+                self._event_sink(DeadlineMiss(self.time, tid, ts.absolute_deadline[i]))
+            if self._timeline is not None:
+                self._timeline.mark_miss(tid)
+            if self.running == i:
+                self.running = None
+            # Drop the job (it missed its deadline); its policy entries go stale
+            ts.remaining_time[i] = 0
+            dropped.append(i)
+            self._job_done(i)
+            self._prune_deadline_calendar()
+
+        if dropped:
+            self.telemetry.record_misses(
+                self.time,
+                len(dropped),
+                sum(self.time - ts.absolute_deadline[i] for i in dropped),
+            )
+        return dropped
+
+    def _update_mode_adaptively(self):
+        """
+        Check recent deadline misses and possibly switch mode.
+
+        Hysteresis: normal -> fallback policy (RM -> EDF by default) above
+        switch_threshold misses in the window, back only at or below
+        switch_back_threshold (a lower number), and never within min_dwell
+        time units of the previous switch.
+        """
+        if self.normal_mode == self.fallback_mode:
+            return
+        if self.time + 1 < self.window_size:
+            return
+        if self.last_switch_time is not None and self.time < self.last_switch_time + self.min_dwell:
+            return
+
+        # time steps with a miss in the last window_size steps
+        misses_recent = self.telemetry.miss_steps(self.time)
+
+        if self.mode == self.normal_mode and misses_recent > self.switch_threshold:
+            self._switch_mode(self.fallback_mode)
+        elif (self.mode == self.fallback_mode and self.switch_back_threshold is not None
+              and misses_recent <= self.switch_back_threshold):
+            self._switch_mode(self.normal_mode)
+
+    def _switch_mode(self, mode):
+        old = self.mode
+        self.mode = mode
+        if self.switch_time is None:
+            self.switch_time = self.time
+        self.last_switch_time = self.time
+        self.switches += 1
+        # every pending job is already in the new policy's structure
+        self.policy = self.policies[mode]
+        self.policy.activate()
+        if self._event_sink is not None:
+            self._event_sink(ModeSwitch(self.time, old, mode))
+
+    def _dispatch(self, current):
+        """
+        Note that task 'current' runs in this time unit, reporting
+        dispatch / preempt events when the running job changes.
+        """
+        previous = self.running
+        if current == previous:
+            return
+        self.running = current
+        if self._event_sink is not None:
+            ts = self.taskset
+            if previous is not None and ts.remaining_time[previous] > 0:
+                self._event_sink(Preempt(self.time, ts.tid[previous], ts.tid[current]))
+            self._event_sink(Dispatch(self.time, ts.tid[current]))
+# seconod id
+    def step(self):
+        """
+        Simulate one time unit.
+        Returns:
+            tid of the running task, or None if CPU is idle.
+        """
+
+        ts = self.taskset
+
+        # 1) Release new jobs if it's time
+        self._release_jobs()
+
+        # 2) Check for deadline misses
+        self._drop_missed_jobs()
+
+        # 3) Adapt mode based on recent performance
+        self._update_mode_adaptively()
+
+        # 4) Pick highest-priority task (according to current policy);
+        #    if no ready tasks, time just moves forward (CPU idle)
+        current = self._pick()
+        if current is None:
+            self.time += 1
+            return None
+
+        # 5) Dispatch it (unless it is already running)
+        tid = ts.tid[current]
+        self._dispatch(current)
+
+        # 6) Run it for one time unit
+        if self.metrics is not None:
+            self.metrics.ran(current, self.time, 1)
+        ts.remaining_time[current] -= 1
+        self.telemetry.record_busy(self.time)
+        if self._run_trackers:
+            self._ran(current, 1)
+
+        # 7) If it still has work it stays in the policy's structure
+        if ts.remaining_time[current] == 0:
+            # Job finished; its policy entries go stale
+            ts.completed_instances[current] += 1
+            self.telemetry.record_completion(
+                self.time, self.time + 1 - ts.absolute_deadline[current]
+            )
+            self._job_done(current)
+            self.running = None
+            if self._event_sink is not None:
+                self._event_sink(Complete(self.time + 1, tid))
+
+        # 8) Advance time
+        self.time += 1
+
+
+        return tid
+
+    def _next_event_time(self):
+        """
+        Earliest time (>= now) at which step() has something to do besides
+        running the current job: a job release, a deadline miss or a
+        possible mode switch. (Decisions the policy itself may change,
+        like an LLF or RR preemption, are capped in _advance().)
+        Returns float('inf') if nothing is pending.
+        """
+        next_event = float("inf")
+
+        # next release
+        if self.release_calendar:
+            next_event = max(self.release_calendar[0][0], self.time)
+
+        # a pending job is dropped just after its deadline
+        self._prune_deadline_calendar()
+        if self.deadline_calendar:
+            next_event = min(next_event, self.deadline_calendar[0][0] + 1)
+
+        # a mode switch that does not follow a new miss
+        next_event = min(next_event, self._next_switch_time())
+
+        return next_event
+
+    def _next_switch_time(self):
+        """
+        Earliest time (>= now) at which _update_mode_adaptively() could
+        switch mode without a new deadline miss first (a miss is an event
+        of its own). float('inf') if that cannot happen.
+        """
+        if self.normal_mode == self.fallback_mode:
+            return float("inf")
+        if self.mode == self.fallback_mode and self.switch_back_threshold is None:
+            return float("inf")
+        w = self.window_size
+        dwell_end = -1
+        if self.last_switch_time is not None:
+            dwell_end = self.last_switch_time + self.min_dwell
+
+        normal = self.mode == self.normal_mode
+        if normal and (dwell_end < self.time or dwell_end <= w - 1):
+            # the first check happens once the window is full; after that
+            # the miss count only grows on a miss, but a switch back (with
+            # switch_back_threshold >= switch_threshold) can leave it too high
+            if self.time < w:
+                return w - 1
+            if (self.switch_back_threshold is not None
+                    and self.telemetry.miss_steps(self.time) > self.switch_threshold):
+                return self.time
+            return float("inf")
+
+        # times of the miss steps still in the window, oldest first
+        flags = self.telemetry.miss_step_flags(self.time - 1)
+        misses = [self.time - w + k for k, flag in enumerate(flags) if flag]
+        earliest = max(self.time, w - 1, dwell_end)
+
+        if normal:
+            # blocked by the dwell time: switch when it ends if the count
+            # (which only falls from here) is still too high
+            recent = sum(1 for t in misses if t > earliest - w)
+            return earliest if recent > self.switch_threshold else float("inf")
+
+        # fallback: once enough misses have slid out of the window
+        excess = len(misses) - self.switch_back_threshold
+        if excess <= 0:
+            return earliest
+        return max(earliest, misses[excess - 1] + w)
+
+    def run_until(self, until, timeline=None):
+        """
+        Event-driven simulation up to (but not including) time 'until'.
+
+        Instead of one step() per time unit, jump straight from one
+        scheduling event (release, completion, deadline miss, mode switch)
+        to the next. In between, the highest-priority job simply keeps
+        running (or the CPU stays idle), so the whole stretch is done at once.
+        Task statistics are the same as calling step() (until - time) times.
+
+        timeline: optional Timeline; the running tid (or None when idle)
+        is appended for every simulated time unit, one run per stretch,
+        and every deadline miss is marked on it.
+        """
+        self._timeline = timeline
+        try:
+            while self.time < until:
+                self._advance(until, timeline)
+        finally:
+            self._timeline = None
+
+    def events(self, until):
+        """
+        Run the simulation up to time 'until', lazily yielding scheduler
+        events (see events.py): Release, Dispatch, Preempt, Complete,
+        DeadlineMiss and ModeSwitch, in time order.
+        Only the events of the current stretch are held in memory, so
+        consumers can be chained into a constant-memory pipeline.
+        """
+        pending = []
+        outer_sink = self._event_sink
+        if outer_sink is None:
+            self._event_sink = pending.append
+        else:
+            # keep feeding the trace too
+            def both(event):
+                outer_sink(event)
+                pending.append(event)
+            self._event_sink = both
+        try:
+            while self.time < until:
+                self._advance(until)
+                yield from pending
+                pending.clear()
+        finally:
+            self._event_sink = outer_sink
+
+    def _advance(self, until, timeline=None):
+        """
+        One move of the event-driven engine: a normal step() if something
+        happens now, otherwise the whole stretch up to the next event
+        (or 'until').
+        """
+        next_event = self._next_event_time()
+
+        # Something happens right now: take a normal step
+        if next_event <= self.time:
+            running_tid = self.step()
+            if timeline is not None:
+                timeline.append(running_tid)
+            return
+
+        span = min(next_event, until) - self.time
+
+        # CPU idle until the next event
+        current = self._pick()
+        if current is None:
+            self.time += span
+            if timeline is not None:
+                timeline.append_run(None, span)
+            return
+
+        # Run the current job until the next event, its completion or
+        # the policy wanting to decide again
+        ts = self.taskset
+        tid = ts.tid[current]
+        self._dispatch(current)
+        span = min(span, ts.remaining_time[current], self.policy.run_limit(current, self.time))
+        if self.metrics is not None:
+            self.metrics.ran(current, self.time, span)
+        ts.remaining_time[current] -= span
+        self.telemetry.record_busy(self.time, span)
+        if self._run_trackers:
+            self._ran(current, span)
+        if ts.remaining_time[current] == 0:
+            ts.completed_instances[current] += 1
+            self.telemetry.record_completion(
+                self.time + span - 1,
+                self.time + span - ts.absolute_deadline[current],
+            )
+            self._job_done(current)
+            self.running = None
+            if self._event_sink is not None:
+                self._event_sink(Complete(self.time + span, tid))
+
+        self.time += span
+        if timeline is not None:
+            timeline.append_run(tid, span)
+
+    # ---------- Hyperperiod cycle detection ----------
+
+    def _fingerprint(self):
+        """
+        Everything that decides the future schedule, relative to now:
+        per task the time to its next release, the work left and the time
+        to its deadline; the mode and the policies' own state (RR's queue
+        order); and, while the mode can still switch, the miss pattern of
+        the adaptation window.
+        Two equal fingerprints mean the schedule repeats from there on.
+        """
+        ts = self.taskset
+        now = self.time
+        tasks = tuple(
+            (ts.next_release[i] - now,
+             ts.remaining_time[i],
+             ts.absolute_deadline[i] - now if ts.remaining_time[i] > 0 else 0)
+            for i in range(len(ts))
+        )
+        policies = tuple(policy.state() for policy in self.policies.values())
+        if self.normal_mode == self.fallback_mode or (
+                self.mode == self.fallback_mode and self.switch_back_threshold is None):
+            return (self.mode, tasks, policies)
+        dwell_left = 0
+        if self.last_switch_time is not None:
+            dwell_left = max(0, self.last_switch_time + self.min_dwell - now)
+        return (self.mode, tasks, policies, min(now, self.window_size), dwell_left,
+                self.telemetry.miss_step_flags(now - 1))
+
+    def _shift_time(self, delta):
+        """
+        Move the whole scheduler state 'delta' time units ahead, as if the
+        schedule had simply gone on repeating.
+        """
+        ts = self.taskset
+        for i in range(len(ts)):
+            ts.next_release[i] += delta
+            ts.absolute_deadline[i] += delta
+        # shifting every key by the same amount keeps the heaps valid
+        self.release_calendar = [(t + delta, tid, i) for t, tid, i in self.release_calendar]
+        self.deadline_calendar = [(d + delta, tid, i) for d, tid, i in self.deadline_calendar]
+        for policy in self.policies.values():
+            policy.shift(delta)
+        if self.last_switch_time is not None:
+            self.last_switch_time += delta
+        self.telemetry.shift(delta)
+        self.time += delta
+
+    def run_cyclic(self, until, timeline=None):
+        """
+        Simulate up to time 'until', skipping repetitions of the schedule.
+
+        The state is fingerprinted at every hyperperiod boundary (LCM of
+        the periods). Once a fingerprint comes back, the stretch between
+        the two boundaries repeats forever, so whole repetitions are added
+        to completed_instances / missed_deadlines at once and only the
+        transient and the last partial cycle are simulated (and the job
+        metrics, if kept, get the skipped cycles' jobs the same way).
+        Results are exact; the run time does not depend on 'until'.
+
+        timeline: optional Timeline (filled in full, so it does cost
+        time proportional to the number of segments).
+
+        Returns timeline statistics:
+            {"busy": {tid: time units run}, "idle": idle time units,
+             "cycle_start": time, "cycle_length": length}
+        (cycle fields are None if no cycle was found before 'until').
+        """
+        ts = self.taskset
+        h = math.lcm(*ts.period) if len(ts) else 1
+        boundary = -(-self.time // h) * h  # first boundary >= now
+
+        busy = {}
+        idle = 0
+        seen = {}  # fingerprint -> (time, completed, missed, busy, idle, timeline length,
+                   #                switches, job metrics snapshot)
+        cycle_start = cycle_length = None
+
+        while self.time < until:
+            if cycle_length is None and self.time == boundary:
+                fingerprint = self._fingerprint()
+                if fingerprint in seen:
+                    t1, completed1, missed1, busy1, idle1, tl1, switches1, metrics1 = seen[fingerprint]
+                    cycle_start, cycle_length = t1, self.time - t1
+                    reps = (until - self.time) // cycle_length
+                    if reps:
+                        for i in range(len(ts)):
+                            ts.completed_instances[i] += reps * (ts.completed_instances[i] - completed1[i])
+                            ts.missed_deadlines[i] += reps * (ts.missed_deadlines[i] - missed1[i])
+                        for tid in busy:
+                            busy[tid] += reps * (busy[tid] - busy1.get(tid, 0))
+                        idle += reps * (idle - idle1)
+                        self.switches += reps * (self.switches - switches1)
+                        if self.metrics is not None:
+                            self.metrics.add_diff(self.metrics.snapshot(), metrics1, reps)
+                        if timeline is not None:
+                            timeline.append_timeline(timeline[tl1:], reps)
+                        self._shift_time(reps * cycle_length)
+                else:
+                    seen[fingerprint] = (
+                        self.time,
+                        list(ts.completed_instances),
+                        list(ts.missed_deadlines),
+                        dict(busy),
+                        idle,
+                        len(timeline) if timeline is not None else 0,
+                        self.switches,
+                        self.metrics.snapshot() if self.metrics is not None else None,
+                    )
+                    boundary += h
+
+            # simulate up to the next boundary (or to the end once the cycle is known)
+            chunk = Timeline()
+            self.run_until(min(until, boundary) if cycle_length is None else until, chunk)
+            for tid, units in chunk.busy_time().items():
+                busy[tid] = busy.get(tid, 0) + units
+            idle += len(chunk) - sum(chunk.busy_time().values())
+            if timeline is not None:
+                timeline.append_timeline(chunk)
+
+        return {
+            "busy": busy,
+            "idle": idle,
+            "cycle_start": cycle_start,
+            "cycle_length": cycle_length,
+        }
@@ -0,0 +1,143 @@
+# simulation.py
+
+import analysis
+import profiling
+from metrics import JobMetrics
+from policies import POLICIES
+from task_model import Task
+from scheduler import AdaptiveScheduler
+from timeline import Timeline
+
+# comparison modes used by the web app, the sweeps and the batch engine
+# (run_simulation() also takes a policy name from policies.POLICIES,
+# e.g. "LLF": that policy alone, no adaptation)
+MODES = ("RM_ONLY", "EDF_ONLY", "ADAPTIVE")
+
+# bump whenever a change can alter simulation results (invalidates caches)
+ENGINE_VERSION = 3
+
+
+def make_tasks(specs):
+    """
+    Build Task objects from (tid, period, exec_time[, deadline]) tuples.
+    """
+    return [Task(*spec) for spec in specs]
+
+
+def _run_hyperperiods(scheduler, sim_time, timeline=None):
+    """
+    Simulate a task set that provably never misses a deadline.
+    Its schedule then restarts identically every hyperperiod, so only
+    min(sim_time, hyperperiod) time units are simulated and the rest
+    (counts and timeline) is filled in from that.
+    """
+    ts = scheduler.taskset
+    h = analysis.hyperperiod(ts)
+    full, rest = divmod(sim_time, h)
+    if full == 0:
+        scheduler.run_until(sim_time, timeline)
+        return
+
+    one_period = Timeline() if timeline is not None else None
+    scheduler.run_until(rest, one_period)
+    completed_in_rest = list(ts.completed_instances)
+    metrics_in_rest = scheduler.metrics.snapshot() if scheduler.metrics is not None else None
+    scheduler.run_until(h, one_period)
+
+    # every job released in a hyperperiod completes within it
+    for i in range(len(ts)):
+        ts.completed_instances[i] = full * (h // ts.period[i]) + completed_in_rest[i]
+    if scheduler.metrics is not None:
+        scheduler.metrics.extrapolate(metrics_in_rest, full)
+
+    if timeline is not None:
+        timeline.append_timeline(one_period, full)
+        timeline.append_timeline(one_period[:rest])
+
+
+def run_simulation(tasks, mode, sim_time, window_size=50, switch_threshold=3,
+                   timeline=None, engine="event", fast_path=True, observer=None,
+                   trace=None, switch_back_threshold=None, min_dwell=0,
+                   policies=None, job_metrics=False):
+    """
+    Simulate one task set under one comparison mode.
+
+    tasks: list of Task objects (or a TaskSet); their statistics are
+        updated in place.
+    mode: "RM_ONLY", "EDF_ONLY", "ADAPTIVE" or a single policy name
+        ("RM", "EDF", "LLF", "DM", "FIFO", "RR")
+    switch_back_threshold / min_dwell: hysteresis of ADAPTIVE (see
+        AdaptiveScheduler); the default never switches back to RM.
+    policies: (normal, fallback) policy names ADAPTIVE moves between;
+        default ("RM", "EDF").
+    timeline: optional Timeline that gets the running tid for every time unit
+    engine: "event" (run_until), "tick" (one step() per time unit) or
+        "cycle" (run_cyclic: skips repetitions of the schedule, so very
+        long horizons cost no more than short ones)
+    fast_path: if analysis proves there will be no misses, simulate one
+        hyperperiod at most and extrapolate (same results).
+    observer: optional profiling.Observer (e.g. a profiling.Profiler)
+        attached to the scheduler for this run.
+    trace: optional tracefile.TraceWriter that gets every scheduler
+        event. Only simulated time is traced, so the fast path is not
+        taken (and the "cycle" engine skips the repeated cycles).
+    job_metrics: also keep per-job response time, lateness and jitter
+        (metrics.JobMetrics) and return their summary as "jobs".
+
+    Returns a dict with the totals, the final mode, the (first) switch
+    time, the number of switches and whether the fast path was taken
+    (and "jobs" with job_metrics).
+    """
+    if mode not in MODES and mode not in POLICIES:
+        raise ValueError(f"unknown mode: {mode}")
+
+    if mode == "ADAPTIVE":
+        policies = tuple(policies or ("RM", "EDF"))
+    elif mode in POLICIES:
+        policies = (mode, mode)
+    else:
+        policies = ("RM", "EDF")
+    # the policy the run starts in (and the one analysis has to check)
+    start = "EDF" if mode == "EDF_ONLY" else policies[0]
+    scheduler = AdaptiveScheduler(tasks, mode=start, trace=trace, policies=policies)
+    scheduler.window_size = window_size
+    scheduler.switch_threshold = switch_threshold
+    if mode != "ADAPTIVE":
+        # Disable adaptation by making threshold unreachable
+        scheduler.switch_threshold = 10**9
+    else:
+        scheduler.switch_back_threshold = switch_back_threshold
+        scheduler.min_dwell = min_dwell
+    if observer is not None:
+        profiling.attach(scheduler, observer)
+    if job_metrics:
+        scheduler.metrics = JobMetrics(scheduler.taskset)
+
+    if engine not in ("event", "tick", "cycle"):
+        raise ValueError(f"unknown engine: {engine}")
+
+    shortcut = fast_path and trace is None and analysis.no_misses(scheduler.taskset, start)
+    if shortcut:
+        _run_hyperperiods(scheduler, sim_time, timeline)
+    elif engine == "event":
+        scheduler.run_until(sim_time, timeline)
+    elif engine == "cycle":
+        scheduler.run_cyclic(sim_time, timeline)
+    elif engine == "tick":
+        for _ in range(sim_time):
+            running_tid = scheduler.step()
+            if timeline is not None:
+                timeline.append(running_tid)
+
+    ts = scheduler.taskset
+    result = {
+        "completed": sum(ts.completed_instances),
+        "missed": sum(ts.missed_deadlines),
+        "final_mode": scheduler.mode,
+        "switch_time": scheduler.switch_time,
+        "switches": scheduler.switches,
+        "fast_path": shortcut,
+    }
+    if job_metrics:
+        result["jobs"] = scheduler.metrics.summary()
+    return result
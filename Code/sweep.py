@@ -0,0 +1,194 @@
+# sweep.py
+
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cache import ResultCache, cached_simulation
+from simulation import MODES, make_tasks, run_simulation
+
+# columns of a sweep result table, in order
+COLUMNS = (
+    "index", "seed", "mode", "sim_time", "window_size", "switch_threshold",
+    "periods", "exec_times", "completed", "missed", "final_mode", "switch_time", "switches",
+    "fast_path",
+)
+
+
+def config_seed(base_seed, index):
+    """
+    Seed of config number 'index': depends only on (base_seed, index),
+    never on which worker runs it or in what order.
+    """
+    return random.Random(f"{base_seed}:{index}").getrandbits(32)
+
+
+def grid(periods, exec_times, window_sizes=(50,), switch_thresholds=(3,),
+         modes=MODES, sim_time=200, seed=0):
+    """
+    All combinations of the given parameter values, as a list of configs.
+
+    periods / exec_times: lists of per-task tuples, e.g. [(10, 15, 20)];
+    a period tuple and an exec-time tuple must have the same length.
+    """
+    configs = []
+    combos = itertools.product(periods, exec_times, window_sizes,
+                               switch_thresholds, modes)
+    for p, e, w, thr, mode in combos:
+        if len(p) != len(e):
+            raise ValueError("period and exec_time tuples differ in length")
+        index = len(configs)
+        configs.append({
+            "index": index,
+            "seed": config_seed(seed, index),
+            "mode": mode,
+            "sim_time": sim_time,
+            "window_size": w,
+            "switch_threshold": thr,
+            "periods": tuple(p),
+            "exec_times": tuple(e),
+        })
+    return configs
+
+
+def random_configs(n_sets, n_tasks, period_range=(10, 100), utilization=0.9,
+                   modes=MODES, sim_time=1000, window_size=50,
+                   switch_threshold=3, seed=0):
+    """
+    n_sets random task sets (each run under every mode), reproducible
+    from 'seed'. Each task gets a random share of 'utilization'.
+    """
+    configs = []
+    for s in range(n_sets):
+        rng = random.Random(config_seed(seed, s))
+        periods = [rng.randint(*period_range) for _ in range(n_tasks)]
+        shares = [rng.random() for _ in range(n_tasks)]
+        total = sum(shares)
+        exec_times = [
+            max(1, round(p * utilization * share / total))
+            for p, share in zip(periods, shares)
+        ]
+        for mode in modes:
+            index = len(configs)
+            configs.append({
+                "index": index,
+                "seed": config_seed(seed, s),
+                "mode": mode,
+                "sim_time": sim_time,
+                "window_size": window_size,
+                "switch_threshold": switch_threshold,
+                "periods": tuple(periods),
+                "exec_times": tuple(exec_times),
+            })
+    return configs
+
+
+def run_config(config, cache=None):
+    """
+    Run one sweep config; returns its result row (a dict).
+    Besides the grid() keys, a config may give "tids" and "deadlines"
+    lists, "engine", "switch_back_threshold", "min_dwell", "policies" and
+    "job_metrics" (True adds the per-job metrics as "jobs").
+    With a ResultCache, configs already simulated are not run again.
+    """
+    # tids default to 1..n and deadlines to the periods
+    periods = config["periods"]
+    tids = config.get("tids") or range(1, len(periods) + 1)
+    deadlines = config.get("deadlines") or periods
+    specs = list(zip(tids, periods, config["exec_times"], deadlines))
+    kwargs = dict(
+        window_size=config["window_size"],
+        switch_threshold=config["switch_threshold"],
+        engine=config.get("engine", "event"),
+        switch_back_threshold=config.get("switch_back_threshold"),
+        min_dwell=config.get("min_dwell", 0),
+        policies=config.get("policies"),
+        job_metrics=config.get("job_metrics", False),
+    )
+    if cache is not None:
+        result = cached_simulation(
+            specs, config["mode"], config["sim_time"], cache=cache, **kwargs
+        )["result"]
+    else:
+        result = run_simulation(make_tasks(specs), config["mode"], config["sim_time"], **kwargs)
+    row = dict(config)
+    row.update(result)
+    return row
+
+
+_worker_caches = {}
+
+
+def _run_chunk(chunk, cache_dir=None):
+    cache = None
+    if cache_dir is not None:
+        # one cache per worker process; the disk tier is shared by all
+        if cache_dir not in _worker_caches:
+            _worker_caches[cache_dir] = ResultCache(directory=cache_dir)
+        cache = _worker_caches[cache_dir]
+    return [run_config(config, cache) for config in chunk]
+
+
+def iter_sweep(configs, workers=None, chunksize=None, cache_dir=None):
+    """
+    Run configs in a process pool and yield result rows as soon as
+    their chunk finishes (not in config order; rows carry "index").
+
+    workers: number of processes (default: all cores); 1 runs in-process.
+    chunksize: configs per task sent to a worker (default: about four
+    chunks per worker, so slow chunks even out).
+    cache_dir: directory of a shared on-disk result cache (None = no cache).
+    """
+    configs = list(configs)
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(configs) / (workers * 4)))
+    chunks = [configs[i:i + chunksize] for i in range(0, len(configs), chunksize)]
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _run_chunk(chunk, cache_dir)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_chunk, chunk, cache_dir) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def sweep(configs, workers=None, chunksize=None, on_row=None, cache_dir=None):
+    """
+    Run all configs and collect the results as columns:
+    {column name: list of values}, sorted by config index.
+    on_row: optional callback called with each row as it arrives.
+    """
+    rows = []
+    for row in iter_sweep(configs, workers, chunksize, cache_dir):
+        rows.append(row)
+        if on_row is not None:
+            on_row(row)
+    rows.sort(key=lambda r: r["index"])
+    return {col: [r[col] for r in rows] for col in COLUMNS}
+
+
+def to_dataframe(columns):
+    """
+    Sweep columns as a pandas DataFrame.
+    """
+    import pandas as pd
+
+    return pd.DataFrame(columns)
+
+
+if __name__ == "__main__":
+    configs = grid(
+        periods=[(10, 15, 20), (12, 18, 24)],
+        exec_times=[(8, 7, 10), (4, 5, 6)],
+        window_sizes=(20, 50),
+        switch_thresholds=(1, 3),
+    )
+    table = sweep(configs)
+    for i in range(len(table["index"])):
+        print({col: table[col][i] for col in COLUMNS})
@@ -1,37 +1,199 @@
-# task_model.py
-
-class Task:
-    """
-    Represents a periodic real-time task.
-    """
-// init ,self,tid,period,exec_time
-    def __init__(self, tid, period, exec_time, deadline=None):
-        """
-        tid: task id (int)
-        period: how often the task is released (time units)
-        exec_time: how long the task needs to run each period
-        deadline: relative deadline (if None, same as period)
-        """
-        self.tid = tid
-        self.period = period
-        self.exec_time = exec_time
-        self.deadline = deadline if deadline is not None else period
-
-        # dynamic state (changes during simulation)
-        self.next_release = 0          # next time this task will be released
-        self.remaining_time = 0        # time left to finish current job
-        self.absolute_deadline = 0     # deadline for the current job
-        self.completed_instances = 0   # how many jobs finished
-        self.missed_deadlines = 0      # how many jobs missed deadline
-
-    def release(self, now):
-        """
-        Release a new job of this task at time 'now'.
-        """
-        self.next_release = now + self.period
-        self.remaining_time = self.exec_time
-        self.absolute_deadline = now + self.deadline
-// selfs
-    def __repr__(self):
-
-        return f"Task(tid={self.tid}, period={self.period}, exec={self.exec_time})"
+# task_model.py
+
+from array import array
+
+
+def _column(name):
+    """
+    Property that reads/writes one field of a Task from its TaskSet row.
+    """
+    def get(self):
+        return getattr(self._set, name)[self._i]
+
+    def set(self, value):
+        getattr(self._set, name)[self._i] = value
+
+    return property(get, set)
+
+
+class Task:
+    """
+    Represents a periodic real-time task.
+
+    A Task is a thin view of one row of a TaskSet, where the data actually
+    lives. A Task built on its own gets a private one-row TaskSet; adding it
+    to a bigger TaskSet (or passing it to the scheduler) moves it there.
+
+    period, exec_time and deadline are stored as 32-bit ints (see
+    TaskSet.FIELDS), so they must be below 2**31; a larger value raises
+    OverflowError. The loader rejects them up front (loader._MAX_TIME).
+    """
+    __slots__ = ("_set", "_i")
+
+    def __init__(self, tid, period, exec_time, deadline=None):
+        """
+        tid: task id (int)
+        period: how often the task is released (time units)
+        exec_time: how long the task needs to run each period
+        deadline: relative deadline (if None, same as period)
+        """
+        self._set = TaskSet()
+        self._i = self._set.append(tid, period, exec_time, deadline)
+
+    @classmethod
+    def _view(cls, taskset, i):
+        task = cls.__new__(cls)
+        task._set = taskset
+        task._i = i
+        return task
+
+    tid = _column("tid")
+    period = _column("period")
+    exec_time = _column("exec_time")
+    deadline = _column("deadline")
+
+    # dynamic state (changes during simulation)
+    next_release = _column("next_release")                # next time this task will be released
+    remaining_time = _column("remaining_time")            # time left to finish current job
+    absolute_deadline = _column("absolute_deadline")      # deadline for the current job
+    completed_instances = _column("completed_instances")  # how many jobs finished
+    missed_deadlines = _column("missed_deadlines")        # how many jobs missed deadline
+
+    def release(self, now):
+        """
+        Release a new job of this task at time 'now'.
+        """
+        self._set.release(self._i, now)
+
+    def __repr__(self):
+
+        return f"Task(tid={self.tid}, period={self.period}, exec={self.exec_time})"
+
+
+class TaskSet:
+    """
+    Struct-of-arrays container for many tasks.
+
+    Every task field is one typed array (array module), indexed by the
+    task's position in the set, so a task costs ~52 bytes instead of a
+    full Python object: 1e6 tasks fit in about 50 MB.
+    The scheduler works on the arrays directly; Task objects are only
+    views for code that wants one task at a time.
+    """
+
+    # (field, array typecode); the task parameters are 32-bit (below
+    # 2**31, like loader._MAX_TIME), absolute times and counters 64-bit
+    FIELDS = (
+        ("tid", "q"),
+        ("period", "i"),
+        ("exec_time", "i"),
+        ("deadline", "i"),
+        ("next_release", "q"),
+        ("remaining_time", "i"),
+        ("absolute_deadline", "q"),
+        ("completed_instances", "q"),
+        ("missed_deadlines", "q"),
+    )
+
+    def __init__(self):
+        for name, code in self.FIELDS:
+            setattr(self, name, array(code))
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """
+        Build a TaskSet from Task objects.
+        The Task objects become views of the new set, so they keep
+        showing the up-to-date statistics.
+        """
+        taskset = cls()
+        for task in tasks:
+            taskset.add(task)
+        return taskset
+
+    @classmethod
+    def from_columns(cls, tids, periods, exec_times, deadlines=None):
+        """
+        Build a TaskSet in bulk from equal-length sequences of task
+        parameters (deadline defaults to the period).
+        """
+        taskset = cls()
+        taskset.tid.extend(tids)
+        taskset.period.extend(periods)
+        taskset.exec_time.extend(exec_times)
+        taskset.deadline.extend(periods if deadlines is None else deadlines)
+
+        n = len(taskset.tid)
+        if not (len(taskset.period) == len(taskset.exec_time)
+                == len(taskset.deadline) == n):
+            raise ValueError("task columns must all have the same length")
+        for name, code in cls.FIELDS[4:]:
+            getattr(taskset, name).extend(array(code, [0]) * n)
+        return taskset
+
+    def append(self, tid, period, exec_time, deadline=None):
+        """
+        Add a new task; returns its index in the set.
+        """
+        self.tid.append(tid)
+        self.period.append(period)
+        self.exec_time.append(exec_time)
+        self.deadline.append(deadline if deadline is not None else period)
+        self.next_release.append(0)
+        self.remaining_time.append(0)
+        self.absolute_deadline.append(0)
+        self.completed_instances.append(0)
+        self.missed_deadlines.append(0)
+        return len(self.tid) - 1
+
+    def add(self, task):
+        """
+        Copy a Task (including its current state) into the set and
+        make the Task a view of the new row. Returns its index.
+        """
+        for name, _ in self.FIELDS:
+            getattr(self, name).append(getattr(task, name))
+        task._set = self
+        task._i = len(self.tid) - 1
+        return task._i
+
+    def release(self, i, now):
+        """
+        Release a new job of task i at time 'now'.
+        """
+        self.next_release[i] = now + self.period[i]
+        self.remaining_time[i] = self.exec_time[i]
+        self.absolute_deadline[i] = now + self.deadline[i]
+
+    def utilization(self):
+        """
+        Total CPU utilization (sum of exec_time / period).
+        """
+        return sum(e / p for e, p in zip(self.exec_time, self.period))
+
+    def nbytes(self):
+        """
+        Memory used by the task arrays (bytes).
+        """
+        return sum(
+            getattr(self, name).buffer_info()[1] * getattr(self, name).itemsize
+            for name, _ in self.FIELDS
+        )
+
+    def __len__(self):
+        return len(self.tid)
+
+    def __getitem__(self, i):
+        n = len(self.tid)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("task index out of range")
+        return Task._view(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.tid)):
+            yield Task._view(self, i)
+
+    def __repr__(self):
+        return f"TaskSet({len(self)} tasks)"
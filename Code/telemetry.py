@@ -0,0 +1,238 @@
+# telemetry.py
+
+
+class SlidingWindow:
+    """
+    Sum of a per-time-unit value over the last `size` time units.
+
+    Values live in a ring buffer with one slot per time unit, plus a
+    running total, so memory is fixed by `size` and does not grow with
+    the length of the simulation.
+    """
+
+    def __init__(self, size):
+        if size < 1:
+            raise ValueError("window size must be at least 1")
+        self.size = size
+        self.slots = [0] * size
+        self.sum = 0
+        self.time = -1  # latest time unit the slots are up to date for
+
+    def advance(self, now):
+        """
+        Slide the window forward so that it ends at time 'now'.
+        Slots of the time units that fall out are cleared.
+        """
+        steps = now - self.time
+        if steps <= 0:
+            return
+        if steps >= self.size:
+            self.slots = [0] * self.size
+            self.sum = 0
+        else:
+            for t in range(self.time + 1, now + 1):
+                i = t % self.size
+                self.sum -= self.slots[i]
+                self.slots[i] = 0
+        self.time = now
+
+    def add(self, time, value=1):
+        """
+        Add 'value' to time unit 'time'.
+        """
+        self.advance(time)
+        if time <= self.time - self.size:
+            return  # already outside the window
+        self.slots[time % self.size] += value
+        self.sum += value
+
+    def add_span(self, start, length, value=1):
+        """
+        Add 'value' to each of the 'length' time units starting at 'start'.
+        Only the part that is still inside the window is touched.
+        """
+        if length <= 0:
+            return
+        end = start + length - 1
+        self.advance(end)
+        for t in range(max(start, end - self.size + 1, self.time - self.size + 1), end + 1):
+            self.slots[t % self.size] += value
+            self.sum += value
+
+    def total(self, now):
+        """
+        Sum over the window ending at time 'now'.
+        """
+        self.advance(now)
+        return self.sum
+
+    def values(self, now):
+        """
+        Per-time-unit values of the window ending at 'now', oldest first.
+        """
+        self.advance(now)
+        return tuple(
+            self.slots[t % self.size] for t in range(now - self.size + 1, now + 1)
+        )
+
+    def shift(self, delta):
+        """
+        Move the window contents 'delta' time units into the future,
+        as if the same values had been recorded that much later.
+        """
+        recent = self.values(self.time)
+        first = self.time + delta - self.size + 1
+        for k, value in enumerate(recent):
+            self.slots[(first + k) % self.size] = value
+        self.time += delta
+
+    def resize(self, size):
+        """
+        Change the window length, keeping the most recent values.
+        """
+        if size < 1:
+            raise ValueError("window size must be at least 1")
+        keep = min(size, self.size)
+        recent = [
+            (t, self.slots[t % self.size])
+            for t in range(self.time - keep + 1, self.time + 1)
+        ]
+        self.size = size
+        self.slots = [0] * size
+        self.sum = 0
+        for t, value in recent:
+            self.slots[t % size] = value
+            self.sum += value
+
+
+class Telemetry:
+    """
+    Sliding-window statistics for the adaptation logic.
+
+    Each metric has its own look-back window (in time units):
+      miss_steps  - time units in which at least one deadline was missed
+      miss_count  - jobs that missed their deadline
+      miss_rate   - missed jobs / finished-or-missed jobs
+      tardiness   - total time past the deadline of jobs that ended late
+      utilization - fraction of time units the CPU was busy
+
+    Every counter is a SlidingWindow, so memory stays constant no matter
+    how long the simulation runs.
+    """
+
+    METRICS = ("miss_steps", "miss_count", "miss_rate", "tardiness", "utilization")
+
+    def __init__(self, windows=None, default_window=50):
+        """
+        windows: optional dict {metric name: window size}; metrics not
+        listed use default_window.
+        """
+        sizes = {name: default_window for name in self.METRICS}
+        for name, size in (windows or {}).items():
+            if name not in sizes:
+                raise ValueError(f"unknown telemetry metric: {name}")
+            sizes[name] = size
+
+        self._miss_steps = SlidingWindow(sizes["miss_steps"])
+        self._miss_count = SlidingWindow(sizes["miss_count"])
+        self._rate_missed = SlidingWindow(sizes["miss_rate"])
+        self._rate_ended = SlidingWindow(sizes["miss_rate"])
+        self._tardiness = SlidingWindow(sizes["tardiness"])
+        self._busy = SlidingWindow(sizes["utilization"])
+
+    def window(self, metric):
+        """
+        Look-back window (time units) of a metric.
+        """
+        return self._windows_of(metric)[0].size
+
+    def set_window(self, metric, size):
+        """
+        Change the look-back window of a metric.
+        """
+        for w in self._windows_of(metric):
+            w.resize(size)
+
+    def _windows_of(self, metric):
+        if metric == "miss_steps":
+            return [self._miss_steps]
+        if metric == "miss_count":
+            return [self._miss_count]
+        if metric == "miss_rate":
+            return [self._rate_missed, self._rate_ended]
+        if metric == "tardiness":
+            return [self._tardiness]
+        if metric == "utilization":
+            return [self._busy]
+        raise ValueError(f"unknown telemetry metric: {metric}")
+
+    def shift(self, delta):
+        """
+        Move every window 'delta' time units into the future (used when
+        the scheduler skips whole repetitions of its schedule).
+        """
+        for name in self.METRICS:
+            for w in self._windows_of(name):
+                w.shift(delta)
+
+    # ----- recording (called by the scheduler) -----
+
+    def record_misses(self, time, count, tardiness):
+        """
+        'count' jobs were dropped at 'time' after missing their deadline,
+        'tardiness' in total past it.
+        """
+        self._miss_steps.add(time)
+        self._miss_count.add(time, count)
+        self._rate_missed.add(time, count)
+        self._rate_ended.add(time, count)
+        self._tardiness.add(time, tardiness)
+
+    def record_completion(self, time, tardiness=0):
+        """
+        A job finished at 'time' (tardiness > 0 if it finished late).
+        """
+        self._rate_ended.add(time)
+        if tardiness > 0:
+            self._tardiness.add(time, tardiness)
+
+    def record_busy(self, start, length=1):
+        """
+        The CPU ran a job for 'length' time units starting at 'start'.
+        """
+        self._busy.add_span(start, length)
+
+    # ----- queries (used by the adaptation rule) -----
+
+    def miss_steps(self, now):
+        return self._miss_steps.total(now)
+
+    def miss_step_flags(self, now):
+        """
+        Per-time-step miss flags of the adaptation window ending at 'now'.
+        """
+        return self._miss_steps.values(now)
+
+    def miss_count(self, now):
+        return self._miss_count.total(now)
+
+    def miss_rate(self, now):
+        ended = self._rate_ended.total(now)
+        if ended == 0:
+            return 0.0
+        return self._rate_missed.total(now) / ended
+
+    def tardiness(self, now):
+        return self._tardiness.total(now)
+
+    def utilization(self, now):
+        span = min(self._busy.size, now + 1)
+        if span <= 0:
+            return 0.0
+        return self._busy.total(now) / span
+
+    def snapshot(self, now):
+        """
+        All metrics at time 'now', as a dict.
+        """
+        return {name: getattr(self, name)(now) for name in self.METRICS}
@@ -0,0 +1,20 @@
+# test_analysis.py
+
+import time
+
+from analysis import edf_schedulable
+from simulation import make_tasks
+
+
+def test_edf_demand_test_at_full_utilization():
+    assert edf_schedulable(make_tasks([(1, 6, 2, 5), (2, 9, 3), (3, 18, 6)])) is True
+    assert edf_schedulable(make_tasks([(1, 6, 2, 2), (2, 6, 1, 2), (3, 3, 1)])) is False
+
+
+def test_edf_demand_test_gives_up_past_the_point_cap():
+    # U == 1 with a constrained deadline: the bound is the hyperperiod,
+    # here ~10**10 time units
+    tasks = make_tasks([(1, 3027, 1009, 3026), (2, 3039, 1013), (3, 3057, 1019)])
+    start = time.perf_counter()
+    assert edf_schedulable(tasks) is None
+    assert time.perf_counter() - start < 10
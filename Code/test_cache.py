@@ -0,0 +1,26 @@
+# test_cache.py
+
+import os
+
+from cache import ResultCache
+
+
+def test_disk_tier_drops_the_least_recently_used(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), disk_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    os.utime(cache._path("a"), (1, 1))
+    os.utime(cache._path("b"), (2, 2))
+    # a disk hit makes "a" the most recently used
+    assert ResultCache(directory=str(tmp_path)).get("a") == 1
+    cache.put("c", 3)
+    assert sorted(os.listdir(tmp_path)) == ["a.pkl", "c.pkl"]
+
+
+def test_disk_tier_stays_within_its_size(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), disk_bytes=10_000)
+    for k in range(20):
+        cache.put(str(k), bytes(3000))
+    sizes = [os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)]
+    assert sum(sizes) <= 10_000 and len(sizes) == 3
+    assert ResultCache(directory=str(tmp_path)).get("19") == bytes(3000)
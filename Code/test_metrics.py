@@ -0,0 +1,42 @@
+# test_metrics.py
+
+import random
+
+import pytest
+
+from simulation import make_tasks, run_simulation
+
+# (engine, fast_path) pairs that must give the same per-job metrics
+ENGINES = [("tick", False), ("event", False), ("event", True), ("cycle", False), ("cycle", True)]
+
+
+def job_summaries(specs, mode, sim_time):
+    return [
+        run_simulation(make_tasks(specs), mode, sim_time, engine=engine,
+                       fast_path=fast_path, job_metrics=True)["jobs"]
+        for engine, fast_path in ENGINES
+    ]
+
+
+def test_cycle_engine_keeps_jitter_between_repeated_cycles():
+    # the largest response change of task 1 is where one skipped
+    # hyperperiod meets the next
+    summaries = job_summaries([(1, 8, 1), (2, 24, 2), (6, 6, 3)], "EDF_ONLY", 51)
+    assert summaries[0]["tasks"][1]["relative_finish_jitter"] == 3
+    for summary in summaries[1:]:
+        assert summary == summaries[0]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_engines_give_the_same_job_metrics(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        specs = []
+        for tid in range(1, rng.randint(1, 4) + 1):
+            period = rng.choice([2, 3, 4, 6, 8, 12, 24, rng.randint(2, 30)])
+            exec_time = rng.randint(1, max(1, period // 2))
+            specs.append((tid, period, exec_time, rng.randint(exec_time, period)))
+        mode = rng.choice(["RM_ONLY", "EDF_ONLY", "ADAPTIVE", "LLF", "RR"])
+        summaries = job_summaries(specs, mode, rng.randint(1, 600))
+        for summary in summaries[1:]:
+            assert summary == summaries[0], (specs, mode)
@@ -0,0 +1,57 @@
+# test_multicore.py
+
+import pytest
+
+from events import Complete, DeadlineMiss, Dispatch, Preempt
+from multicore import GlobalScheduler, partition
+from scheduler import AdaptiveScheduler
+from simulation import make_tasks
+from timeline import Timeline
+
+SPECS = [(1, 10, 3), (2, 10, 2), (3, 10, 2), (4, 10, 1)]
+
+
+@pytest.mark.parametrize("mode", ["EDF_ONLY", "LLF", "FIFO"])
+def test_first_fit_and_worst_fit_differ(mode):
+    # LLF and FIFO have no schedulability test: they are packed by U <= 1
+    first = partition(make_tasks(SPECS), 2, "first_fit", mode)
+    worst = partition(make_tasks(SPECS), 2, "worst_fit", mode)
+    assert [[t.tid for t in core] for core in first] == [[1, 2, 3, 4], []]
+    assert [[t.tid for t in core] for core in worst] == [[1, 4], [2, 3]]
+
+
+def test_global_run_cyclic_is_not_available():
+    with pytest.raises(NotImplementedError):
+        GlobalScheduler(make_tasks([(1, 4, 1), (2, 6, 2)]), 2).run_cyclic(100)
+
+
+@pytest.mark.parametrize("policy", ["RM", "EDF", "LLF", "RR"])
+def test_global_events_on_one_core_match_single_cpu(policy):
+    specs = [(1, 10, 8), (2, 15, 7), (3, 20, 10), (4, 12, 3)]
+    single = AdaptiveScheduler(make_tasks(specs), policy, policies=(policy, policy))
+    one_core = GlobalScheduler(make_tasks(specs), 1, policy, policies=(policy, policy))
+    assert list(one_core.events(300)) == list(single.events(300))
+
+
+def test_global_events_give_each_task_its_busy_time():
+    specs = [(1, 10, 8), (2, 15, 7), (3, 20, 10), (4, 12, 3), (5, 30, 9)]
+    scheduler = GlobalScheduler(make_tasks(specs), 2, "EDF")
+    busy, since = {}, {}
+    for event in scheduler.events(300):
+        if isinstance(event, Dispatch):
+            if event.tid in since:
+                # a migration: it moves to another core without stopping
+                busy[event.tid] = busy.get(event.tid, 0) + event.time - since[event.tid]
+            since[event.tid] = event.time
+        elif isinstance(event, (Preempt, Complete, DeadlineMiss)) and event.tid in since:
+            busy[event.tid] = busy.get(event.tid, 0) + event.time - since.pop(event.tid)
+    for tid, start in since.items():
+        busy[tid] = busy.get(tid, 0) + 300 - start
+
+    timelines = [Timeline(), Timeline()]
+    GlobalScheduler(make_tasks(specs), 2, "EDF").run_until(300, timelines)
+    expected = {}
+    for timeline in timelines:
+        for tid, units in timeline.busy_time().items():
+            expected[tid] = expected.get(tid, 0) + units
+    assert busy == expected
@@ -0,0 +1,40 @@
+# test_scheduler.py
+
+import random
+
+import pytest
+
+from scheduler import AdaptiveScheduler
+from task_model import Task
+
+
+def run(specs, engine, sim_time, window_size, switch_threshold, switch_back_threshold, min_dwell):
+    tasks = [Task(*spec) for spec in specs]
+    scheduler = AdaptiveScheduler(tasks, "RM")
+    scheduler.window_size = window_size
+    scheduler.switch_threshold = switch_threshold
+    scheduler.switch_back_threshold = switch_back_threshold
+    scheduler.min_dwell = min_dwell
+    if engine == "tick":
+        for _ in range(sim_time):
+            scheduler.step()
+    else:
+        scheduler.run_until(sim_time)
+    return ([(t.completed_instances, t.missed_deadlines) for t in tasks],
+            scheduler.mode, scheduler.switch_time, scheduler.switches)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_event_engine_switches_back_like_step(seed):
+    # switch_back_threshold >= switch_threshold: a switch back can leave
+    # the miss count above the threshold, so the next check switches again
+    rng = random.Random(seed)
+    for _ in range(150):
+        specs = []
+        for tid in range(1, rng.randint(1, 5) + 1):
+            period = rng.randint(3, 30)
+            specs.append((tid, period, rng.randint(1, period)))
+        threshold = rng.randint(0, 6)
+        settings = (rng.randint(1, 1500), rng.randint(1, 40), threshold,
+                    rng.randint(threshold, threshold + 4), rng.choice([0, 0, rng.randint(1, 80)]))
+        assert run(specs, "tick", *settings) == run(specs, "event", *settings), (specs, settings)
@@ -0,0 +1,28 @@
+# test_workload.py
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from workload import generate, log_uniform_periods, uniform_periods  # noqa: E402
+
+
+@pytest.mark.parametrize("periods", [log_uniform_periods, uniform_periods])
+def test_periods_are_multiples_of_granularity(periods):
+    # 15 is no multiple of 10: the smallest period allowed is 20
+    drawn = periods(2000, 8, 15, 95, np.random.default_rng(0), granularity=10)
+    assert (drawn % 10 == 0).all()
+    assert drawn.min() >= 20 and drawn.max() <= 90
+
+
+@pytest.mark.parametrize("periods", [log_uniform_periods, uniform_periods])
+def test_no_multiple_of_granularity_in_range(periods):
+    with pytest.raises(ValueError):
+        periods(1, 3, 11, 19, np.random.default_rng(0), granularity=10)
+
+
+def test_generate_rounds_periods():
+    workload = generate(500, 6, 0.8, periods="uniform", period_range=(15, 95),
+                        granularity=10, seed=1)
+    assert (workload.periods % 10 == 0).all()
+    assert workload.periods.min() >= 20
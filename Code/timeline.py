@@ -0,0 +1,172 @@
+# timeline.py
+
+from array import array
+from bisect import bisect_right
+
+_IDLE = -(2**63)  # stored tid for "CPU idle" (None outside this class)
+
+
+class Timeline:
+    """
+    Run-length-encoded CPU timeline.
+
+    Instead of one entry per time unit, it keeps segments
+    (start, end, tid): task 'tid' ran (or the CPU was idle, tid None)
+    for every time unit in [start, end). Consecutive units of the same
+    task share one segment, so memory grows with the number of context
+    switches, not with the simulated time.
+
+    Behaves like the old list of tids where it matters: len(), indexing,
+    iteration and slicing work per time unit.
+
+    Deadline misses are kept alongside, as (time unit, tid) pairs.
+    """
+
+    def __init__(self, tids=()):
+        self.starts = array("q")
+        self.ends = array("q")
+        self.tids = array("q")
+        self.miss_times = array("q")
+        self.miss_tids = array("q")
+        for tid in tids:
+            self.append(tid)
+
+    # ----- building -----
+
+    def append_run(self, tid, length):
+        """
+        Add 'length' time units of task 'tid' (None = idle) at the end.
+        """
+        if length <= 0:
+            return
+        code = _IDLE if tid is None else tid
+        if self.tids and self.tids[-1] == code:
+            self.ends[-1] += length
+            return
+        start = self.ends[-1] if self.ends else 0
+        self.starts.append(start)
+        self.ends.append(start + length)
+        self.tids.append(code)
+
+    def append(self, tid):
+        """
+        Add one time unit of task 'tid' (None = idle).
+        """
+        self.append_run(tid, 1)
+
+    def extend(self, tids):
+        for tid in tids:
+            self.append_run(tid, 1)
+
+    def mark_miss(self, tid):
+        """
+        Record that a job of 'tid' was dropped after missing its deadline
+        at the current end of the timeline (the next time unit).
+        """
+        self.miss_times.append(len(self))
+        self.miss_tids.append(tid)
+
+    def append_timeline(self, other, times=1):
+        """
+        Append all segments (and misses) of another Timeline,
+        'times' times over.
+        """
+        for _ in range(times):
+            offset = len(self)
+            for start, end, tid in other.segments():
+                self.append_run(tid, end - start)
+            for time, tid in other.misses():
+                self.miss_times.append(offset + time)
+                self.miss_tids.append(tid)
+
+    # ----- reading -----
+
+    def segments(self):
+        """
+        Yield (start, end, tid) per segment; tid is None when idle.
+        """
+        for start, end, code in zip(self.starts, self.ends, self.tids):
+            yield start, end, (None if code == _IDLE else code)
+
+    def misses(self):
+        """
+        Yield (time unit, tid) for every recorded deadline miss.
+        """
+        return zip(self.miss_times, self.miss_tids)
+
+    def num_segments(self):
+        return len(self.tids)
+
+    def busy_time(self):
+        """
+        {tid: time units it ran}, without the idle time.
+        """
+        totals = {}
+        for start, end, tid in self.segments():
+            if tid is not None:
+                totals[tid] = totals.get(tid, 0) + end - start
+        return totals
+
+    def to_numpy(self, idle=0):
+        """
+        Expand to one NumPy entry per time unit ('idle' where idle).
+        """
+        import numpy as np
+
+        codes = np.frombuffer(self.tids, dtype=np.int64)
+        codes = np.where(codes == _IDLE, idle, codes)
+        lengths = np.frombuffer(self.ends, dtype=np.int64) - np.frombuffer(self.starts, dtype=np.int64)
+        return np.repeat(codes, lengths)
+
+    def __len__(self):
+        return self.ends[-1] if self.ends else 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._slice(key)
+        n = len(self)
+        if key < 0:
+            key += n
+        if not 0 <= key < n:
+            raise IndexError("timeline index out of range")
+        code = self.tids[bisect_right(self.starts, key) - 1]
+        return None if code == _IDLE else code
+
+    def _slice(self, key):
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            raise ValueError("timeline slices must have step 1")
+        part = Timeline()
+        if start >= stop:
+            return part
+        first = bisect_right(self.starts, start) - 1
+        for i in range(first, len(self.tids)):
+            if self.starts[i] >= stop:
+                break
+            seg_start = max(self.starts[i], start)
+            seg_end = min(self.ends[i], stop)
+            part.append_run(
+                None if self.tids[i] == _IDLE else self.tids[i],
+                seg_end - seg_start,
+            )
+        for time, tid in self.misses():
+            if start <= time < stop:
+                part.miss_times.append(time - start)
+                part.miss_tids.append(tid)
+        return part
+
+    def __iter__(self):
+        for start, end, tid in self.segments():
+            for _ in range(end - start):
+                yield tid
+
+    def __eq__(self, other):
+        if isinstance(other, Timeline):
+            return (self.starts == other.starts and self.ends == other.ends
+                    and self.tids == other.tids
+                    and self.miss_times == other.miss_times
+                    and self.miss_tids == other.miss_tids)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Timeline({len(self)} time units, {self.num_segments()} segments)"
@@ -0,0 +1,210 @@
+# tracefile.py
+
+import mmap
+import struct
+
+from events import Start, Release, Dispatch, Preempt, Complete, DeadlineMiss, ModeSwitch
+from policies import POLICIES
+
+# File layout: a 32-byte header, then fixed-width 32-byte records
+#   time (int64), tid (int64), value (int64), event type (uint8),
+#   mode (uint8), 6 padding bytes; little-endian.
+# 'value' is the deadline (Release, DeadlineMiss), the preempting tid
+# (Preempt) or the new mode (ModeSwitch, whose 'tid' is the old mode).
+MAGIC = b"SCHTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sII16x")
+RECORD = struct.Struct("<qqqBB6x")
+
+# event type codes (position in this tuple) and mode codes
+TYPES = (Start, Release, Dispatch, Preempt, Complete, DeadlineMiss, ModeSwitch)
+TYPE_CODES = {cls: code for code, cls in enumerate(TYPES)}
+# (the registered policies; RM and EDF come first, so their codes are
+# the same as before there were more)
+MODES = tuple(POLICIES)
+MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+
+# numpy dtype of one record (for TraceReader.array)
+RECORD_DTYPE = [("time", "<i8"), ("tid", "<i8"), ("value", "<i8"),
+                ("type", "u1"), ("mode", "u1"), ("pad", "V6")]
+
+
+def _encode(event):
+    # (tid, value) of an event
+    if isinstance(event, Start):
+        return 0, 0
+    if isinstance(event, (Release, DeadlineMiss)):
+        return event.tid, event.deadline
+    if isinstance(event, Preempt):
+        return event.tid, event.by
+    if isinstance(event, ModeSwitch):
+        return MODE_CODES[event.old], MODE_CODES[event.new]
+    return event.tid, 0
+
+
+def _decode(time, tid, value, code, mode):
+    cls = TYPES[code]
+    if cls is Start:
+        return Start(time, MODES[mode])
+    if cls in (Release, DeadlineMiss):
+        return cls(time, tid, value)
+    if cls is Preempt:
+        return Preempt(time, tid, value)
+    if cls is ModeSwitch:
+        return ModeSwitch(time, MODES[tid], MODES[value])
+    return cls(time, tid)
+
+
+class TraceWriter:
+    """
+    Writes scheduler events to a binary trace file.
+
+    Records are packed into an in-memory buffer of 'buffer_records'
+    records and written out in one call whenever it fills up (and on
+    close), so tracing costs one struct pack per event.
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path, buffer_records=65536):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self._buffer = bytearray(RECORD.size * buffer_records)
+        self._used = 0
+        self.count = 0
+
+    def write(self, event, mode="RM"):
+        """
+        Append one event; 'mode' is the scheduler mode at that moment.
+        """
+        tid, value = _encode(event)
+        RECORD.pack_into(
+            self._buffer, self._used,
+            event.time, tid, value, TYPE_CODES[type(event)], MODE_CODES[mode],
+        )
+        self._used += RECORD.size
+        self.count += 1
+        if self._used == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        self._file.write(memoryview(self._buffer)[:self._used])
+        self._used = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """
+    Reads a trace file through a memory map: records are decoded only
+    when asked for, so opening, len(), indexing and time lookups cost the
+    same for a trace of 1e3 or 1e8 events, and replays stream.
+
+    Records are in time order (as the scheduler wrote them).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} scheduler trace")
+        self._count = (len(self._map) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def record(self, i):
+        """
+        Raw record i: (time, tid, value, type code, mode code).
+        """
+        if not 0 <= i < self._count:
+            raise IndexError("trace index out of range")
+        return RECORD.unpack_from(self._map, HEADER.size + i * RECORD.size)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        return _decode(*self.record(i))
+
+    def find_time(self, time):
+        """
+        Index of the first record at or after 'time' (binary search).
+        """
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.record(mid)[0] < time:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def records(self, start=0, stop=None, chunk=65536):
+        """
+        Yield raw records start..stop-1, decoding one chunk at a time.
+        """
+        stop = self._count if stop is None else min(stop, self._count)
+        for first in range(start, stop, chunk):
+            last = min(first + chunk, stop)
+            view = memoryview(self._map)[HEADER.size + first * RECORD.size:
+                                         HEADER.size + last * RECORD.size]
+            try:
+                yield from RECORD.iter_unpack(view)
+            finally:
+                view.release()
+
+    def events(self, types=None, tids=None, start_time=None, end_time=None):
+        """
+        Replay the trace as event namedtuples (see events.py), optionally
+        only events of the given classes / tids, with start_time <= time
+        < end_time. The time range is found by binary search, so only
+        the records inside it are read.
+        """
+        start = 0 if start_time is None else self.find_time(start_time)
+        stop = self._count if end_time is None else self.find_time(end_time)
+        codes = None if types is None else {TYPE_CODES[cls] for cls in types}
+        tids = None if tids is None else set(tids)
+        for time, tid, value, code, mode in self.records(start, stop):
+            if codes is not None and code not in codes:
+                continue
+            if tids is not None and (TYPES[code] in (Start, ModeSwitch) or tid not in tids):
+                continue
+            yield _decode(time, tid, value, code, mode)
+
+    def array(self, start=0, stop=None):
+        """
+        Records start..stop-1 as a NumPy structured array (RECORD_DTYPE)
+        that reads straight from the memory map, without copying; for
+        fast vectorised filters and counts over large traces.
+        Drop the array before close().
+        """
+        import numpy as np
+
+        stop = self._count if stop is None else min(stop, self._count)
+        return np.frombuffer(
+            self._map, dtype=np.dtype(RECORD_DTYPE),
+            count=max(0, stop - start), offset=HEADER.size + start * RECORD.size,
+        )
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,23 +1,161 @@
-# visualization.py
-
-import matplotlib.pyplot as plt
-
-// timeline
-def plot_timeline(timeline):
-    """
-    Draw a simple timeline of which task is running at each time unit.
-    0 = CPU idle, 1/2/3 = task IDs.
-    """
-    times = list(range(len(timeline)))
-    # Map None -> 0 (idle), task id stays same
-    y_values = [0 if tid is None else tid for tid in timeline]
-//figure,step shown on
-    plt.figure(figsize=(10, 4))
-    plt.step(times, y_values, where="post")
-    plt.yticks([0, 1, 2, 3], ["Idle", "Task 1", "Task 2", "Task 3"])
-    plt.xlabel("Time (units)")
-    plt.ylabel("Who is running")
-    plt.title("Adaptive Scheduler Timeline")
-    plt.tight_layout()
-
-    plt.show()
+# visualization.py
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from timeline import _IDLE
+
+# bar colours, cycled when there are more tasks than colours
+_COLORS = [
+    "#4e79a7", "#f28e2b", "#59a14f", "#e15759", "#76b7b2",
+    "#edc948", "#b07aa1", "#ff9da7", "#9c755f", "#bab0ac",
+]
+
+
+def _runs(occupied):
+    """
+    (first, last + 1) index pairs of the True runs in a boolean array.
+    """
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], occupied.astype(np.int8), [0]))))
+    return edges[0::2], edges[1::2]
+
+
+def gantt_bars(timeline, width_px=1000):
+    """
+    Bars to draw for a Timeline: {tid: (starts, lengths)} as NumPy arrays,
+    idle time left out.
+
+    With at most 'width_px' segments every segment is one bar. With more,
+    time is cut into 'width_px' equal bins (one per pixel column) and a
+    task gets a bar over every run of bins it ran in at all, so the
+    number of bars never grows past what the picture can show.
+    """
+    starts = np.frombuffer(timeline.starts, dtype=np.int64)
+    ends = np.frombuffer(timeline.ends, dtype=np.int64)
+    codes = np.frombuffer(timeline.tids, dtype=np.int64)
+    busy = codes != _IDLE
+    starts, ends, codes = starts[busy], ends[busy], codes[busy]
+
+    bars = {}
+    if len(codes) <= width_px:
+        for tid in np.unique(codes):
+            mine = codes == tid
+            bars[int(tid)] = (starts[mine], ends[mine] - starts[mine])
+        return bars
+
+    # 1. bin width in time units, so that there are at most width_px bins
+    bin_len = -(-len(timeline) // width_px)
+    n_bins = -(-len(timeline) // bin_len)
+    first = starts // bin_len
+    last = (ends - 1) // bin_len
+
+    for tid in np.unique(codes):
+        mine = codes == tid
+        # 2. mark the bins each segment touches (difference array + cumsum)
+        marks = np.zeros(n_bins + 1, dtype=np.int64)
+        np.add.at(marks, first[mine], 1)
+        np.add.at(marks, last[mine] + 1, -1)
+        occupied = np.cumsum(marks[:-1]) > 0
+        # 3. one bar per run of occupied bins
+        lo, hi = _runs(occupied)
+        bar_starts = lo * bin_len
+        bar_ends = np.minimum(hi * bin_len, len(timeline))
+        bars[int(tid)] = (bar_starts, bar_ends - bar_starts)
+    return bars
+
+
+def draw_gantt(ax, timeline, title="Adaptive Scheduler Timeline",
+               width_px=1000, tids=None):
+    """
+    Draw a Gantt chart of a Timeline on a matplotlib Axes: one row per
+    task, one bar per execution segment (downsampled to 'width_px' bars
+    across), and a red 'x' where a job was dropped for missing its
+    deadline.
+
+    tids: rows to show, top to bottom (default: every task that ran or
+    missed, in tid order).
+    """
+    bars = gantt_bars(timeline, width_px)
+    miss_times = np.frombuffer(timeline.miss_times, dtype=np.int64)
+    miss_tids = np.frombuffer(timeline.miss_tids, dtype=np.int64)
+    if tids is None:
+        tids = sorted(set(bars) | set(int(t) for t in np.unique(miss_tids)))
+    row = {tid: i for i, tid in enumerate(tids)}
+
+    for tid in tids:
+        if tid in bars:
+            bar_starts, lengths = bars[tid]
+            ax.broken_barh(
+                np.column_stack((bar_starts, lengths)),
+                (row[tid] - 0.4, 0.8),
+                facecolors=_COLORS[row[tid] % len(_COLORS)],
+            )
+
+    if len(miss_times):
+        # at most one marker per (pixel column, task)
+        bin_len = max(1, -(-len(timeline) // width_px))
+        shown = np.isin(miss_tids, list(row))
+        points = np.unique(np.column_stack((miss_times[shown] // bin_len, miss_tids[shown])), axis=0)
+        if len(points):
+            ax.scatter(
+                points[:, 0] * bin_len,
+                [row[int(tid)] for tid in points[:, 1]],
+                marker="x", color="red", zorder=3, label="Deadline miss",
+            )
+            ax.legend(loc="upper right", fontsize="small")
+
+    ax.set_yticks(range(len(tids)))
+    ax.set_yticklabels([f"Task {tid}" for tid in tids])
+    ax.set_ylim(len(tids) - 0.5, -0.5)
+    ax.set_xlim(0, max(len(timeline), 1))
+    ax.set_xlabel("Time (units)")
+    ax.set_ylabel("Task")
+    ax.set_title(title)
+
+
+def gantt_figure(timeline, title="Adaptive Scheduler Timeline",
+                 width_px=1000, dpi=100, tids=None):
+    """
+    Gantt chart of a Timeline as a new matplotlib Figure.
+
+    The Figure is not attached to pyplot, so this works headless (no
+    display, no plt.show()) and the figure is freed with the object.
+    The same chart is used by the CLI and the web app.
+    """
+    n_rows = len(tids) if tids is not None else max(
+        1, len(set(timeline.tids) - {_IDLE} | set(timeline.miss_tids))
+    )
+    height = min(2 + 0.3 * n_rows, 20)
+    fig = Figure(figsize=(width_px / dpi, height), dpi=dpi)
+    ax = fig.add_subplot()
+    draw_gantt(ax, timeline, title, width_px, tids)
+    fig.tight_layout()
+    return fig
+
+
+def save_gantt(timeline, path, title="Adaptive Scheduler Timeline",
+               width_px=1000, dpi=100, tids=None):
+    """
+    Write the Gantt chart of a Timeline to 'path'; the format (PNG, SVG,
+    ...) follows the file extension.
+    """
+    fig = gantt_figure(timeline, title, width_px, dpi, tids)
+    fig.savefig(path)
+    return path
+
+
+# timeline
+def plot_timeline(timeline, path=None):
+    """
+    Show the Gantt chart of a Timeline in a window, or save it to
+    'path' instead when one is given (no display needed then).
+    """
+    if path is not None:
+        return save_gantt(timeline, path)
+
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(10, 4))
+    draw_gantt(fig.add_subplot(), timeline)
+    fig.tight_layout()
+    plt.show()
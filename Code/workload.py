@@ -0,0 +1,329 @@
+# workload.py
+
+from collections import namedtuple
+
+import numpy as np
+
+from task_model import Task, TaskSet
+
+UTILIZATION_METHODS = ("uunifast", "uunifast-discard", "randfixedsum")
+
+# task sets generated per block by iter_workloads(); every block has its
+# own seed, so the sets only depend on the seed and the block size
+BLOCK = 65536
+
+# attempts per set before UUniFast-Discard gives up
+_MAX_DISCARD_ROUNDS = 1000
+
+
+def make_rng(seed=None):
+    """
+    A NumPy Generator: 'seed' may be an int, a SeedSequence, an existing
+    Generator (returned as is) or None (fresh entropy).
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+# ---------- utilizations ----------
+
+def uunifast(n_sets, n_tasks, utilization, rng=None):
+    """
+    UUniFast (Bini & Buttazzo): (n_sets, n_tasks) task utilizations,
+    each row summing to 'utilization' and uniformly distributed over
+    that simplex. Single utilizations may exceed 1 when 'utilization'
+    does; use uunifast_discard() or randfixedsum() then.
+    """
+    rng = make_rng(rng)
+    if n_tasks < 1:
+        raise ValueError("n_tasks must be at least 1")
+    # sum of the utilizations still to hand out, after each task
+    exponents = 1.0 / np.arange(n_tasks - 1, 0, -1)
+    left = utilization * np.cumprod(rng.random((n_sets, n_tasks - 1)) ** exponents, axis=1)
+    bounds = np.empty((n_sets, n_tasks + 1))
+    bounds[:, 0] = utilization
+    bounds[:, 1:-1] = left
+    bounds[:, -1] = 0.0
+    return bounds[:, :-1] - bounds[:, 1:]
+
+
+def uunifast_discard(n_sets, n_tasks, utilization, rng=None, max_task=1.0):
+    """
+    UUniFast-Discard (Davis & Burns): like uunifast(), but rows with a
+    task utilization above 'max_task' are drawn again. Gets slow as
+    'utilization' nears n_tasks * max_task (randfixedsum() does not).
+    """
+    rng = make_rng(rng)
+    if utilization > n_tasks * max_task:
+        raise ValueError(f"utilization {utilization} is above {n_tasks} x {max_task}")
+    out = uunifast(n_sets, n_tasks, utilization, rng)
+    bad = np.flatnonzero((out > max_task).any(axis=1))
+    for _ in range(_MAX_DISCARD_ROUNDS):
+        if not len(bad):
+            return out
+        out[bad] = uunifast(len(bad), n_tasks, utilization, rng)
+        bad = bad[(out[bad] > max_task).any(axis=1)]
+    raise ValueError(f"UUniFast-Discard found no valid set for utilization {utilization} "
+                     f"over {n_tasks} tasks; use randfixedsum")
+
+
+def randfixedsum(n_sets, n_tasks, utilization, rng=None, low=0.0, high=1.0):
+    """
+    RandFixedSum (Stafford; Emberson, Stafford & Davis): (n_sets,
+    n_tasks) values in [low, high], each row summing to 'utilization',
+    uniformly distributed over that part of the simplex. Unlike
+    UUniFast-Discard this never redraws, so it stays fast for total
+    utilizations close to n_tasks * high (e.g. multi-core sets).
+    """
+    rng = make_rng(rng)
+    n = n_tasks
+    if n < 1:
+        raise ValueError("n_tasks must be at least 1")
+    if not n * low <= utilization <= n * high:
+        raise ValueError(f"utilization {utilization} is outside [{n * low}, {n * high}]")
+    # 1. solve on the unit cube, then scale to [low, high]
+    s = (utilization - n * low) / (high - low)
+    if n == 1:
+        return np.full((n_sets, 1), utilization, dtype=float)
+    k = min(max(int(np.floor(s)), 0), n - 1)
+    s = min(max(s, k), k + 1)
+    s1 = s - np.arange(k, k - n, -1)
+    s2 = np.arange(k + n, k, -1) - s
+
+    # 2. transition probabilities between the simplices that tile the
+    # slice of the cube (w: their volumes, up to a common scale)
+    tiny = np.finfo(float).tiny
+    w = np.zeros((n, n + 1))
+    w[0, 1] = np.finfo(float).max
+    t = np.zeros((n - 1, n))
+    for i in range(2, n + 1):
+        tmp1 = w[i - 2, 1:i + 1] * s1[:i] / i
+        tmp2 = w[i - 2, :i] * s2[n - i:n] / i
+        w[i - 1, 1:i + 1] = tmp1 + tmp2
+        tmp3 = w[i - 1, 1:i + 1] + tiny
+        down = s2[n - i:n] > s1[:i]
+        t[i - 2, :i] = np.where(down, tmp2 / tmp3, 1 - tmp1 / tmp3)
+
+    # 3. walk down the dimensions, all sets at once
+    x = np.empty((n_sets, n))
+    rt = rng.random((n_sets, n - 1))  # which simplex
+    rs = rng.random((n_sets, n - 1))  # where in it
+    left = np.full(n_sets, s)
+    j = np.full(n_sets, k + 1)
+    sm = np.zeros(n_sets)
+    pr = np.ones(n_sets)
+    for i in range(n - 1, 0, -1):
+        e = rt[:, n - i - 1] <= t[i - 1, j - 1]
+        sx = rs[:, n - i - 1] ** (1.0 / i)
+        sm += (1 - sx) * pr * left / (i + 1)
+        pr *= sx
+        x[:, n - i - 1] = sm + pr * e
+        left -= e
+        j -= e
+    x[:, n - 1] = sm + pr * left
+
+    # 4. the walk fills the coordinates in a fixed order: shuffle each row
+    order = rng.random((n_sets, n)).argsort(axis=1)
+    x = np.take_along_axis(x, order, axis=1)
+    return low + (high - low) * x
+
+
+# ---------- periods ----------
+
+def _period_bounds(low, high, granularity):
+    # the smallest and largest multiples of 'granularity' in [low, high]
+    if not 1 <= low <= high:
+        raise ValueError("periods need 1 <= low <= high")
+    if granularity < 1:
+        raise ValueError("granularity must be at least 1")
+    low = -(-low // granularity) * granularity
+    high = high // granularity * granularity
+    if low > high:
+        raise ValueError(f"no multiple of granularity {granularity} in the period range")
+    return low, high
+
+
+def log_uniform_periods(n_sets, n_tasks, low, high, rng=None, granularity=1):
+    """
+    Integer periods in [low, high], log-uniformly distributed (Emberson,
+    Stafford & Davis), so each order of magnitude gets as many tasks;
+    rounded down to a multiple of 'granularity' (within [low, high]).
+    """
+    rng = make_rng(rng)
+    low, high = _period_bounds(low, high, granularity)
+    drawn = np.exp(rng.uniform(np.log(low), np.log(high + granularity), (n_sets, n_tasks)))
+    periods = (drawn // granularity).astype(np.int64) * granularity
+    return np.clip(periods, low, high)
+
+
+def uniform_periods(n_sets, n_tasks, low, high, rng=None, granularity=1):
+    """
+    Integer periods uniformly distributed over the multiples of
+    'granularity' in [low, high].
+    """
+    rng = make_rng(rng)
+    low, high = _period_bounds(low, high, granularity)
+    return rng.integers(low // granularity, high // granularity + 1, (n_sets, n_tasks)) * granularity
+
+
+def harmonic_periods(n_sets, n_tasks, low, high, rng=None, factor=2):
+    """
+    Harmonic periods: each set has a base period in [low, low * factor)
+    and every task a period base * factor**k <= high, so every period
+    divides all the longer ones (RM then schedules up to utilization 1,
+    and the hyperperiod is the longest period).
+    """
+    rng = make_rng(rng)
+    if not 1 <= low <= high or factor < 2:
+        raise ValueError("harmonic periods need 1 <= low <= high and factor >= 2")
+    base = rng.integers(low, min(low * factor, high + 1), (n_sets, 1))
+    # largest k with base * factor**k <= high, per set
+    top = np.floor(np.log(high / base) / np.log(factor) + 1e-9).astype(np.int64)
+    k = np.floor(rng.random((n_sets, n_tasks)) * (top + 1)).astype(np.int64)
+    return base * factor ** k
+
+
+PERIOD_GENERATORS = {
+    "log-uniform": log_uniform_periods,
+    "uniform": uniform_periods,
+    "harmonic": harmonic_periods,
+}
+
+
+# ---------- task sets ----------
+
+class Workload(namedtuple("Workload", "tids periods exec_times deadlines")):
+    """
+    A batch of generated task sets: four (n_sets, n_tasks) int64 arrays,
+    row b being task set b. The arrays can go straight into
+    BatchSimulator; task_set(b) / tasks(b) give one set for the scalar
+    schedulers.
+    """
+
+    @property
+    def n_sets(self):
+        return self.periods.shape[0]
+
+    def utilization(self):
+        """
+        Actual total utilization of every set (after rounding the
+        execution times to whole time units).
+        """
+        return (self.exec_times / self.periods).sum(axis=1)
+
+    def task_set(self, b):
+        """
+        Task set b as a TaskSet.
+        """
+        return TaskSet.from_columns(
+            self.tids[b].tolist(), self.periods[b].tolist(),
+            self.exec_times[b].tolist(), self.deadlines[b].tolist(),
+        )
+
+    def tasks(self, b):
+        """
+        Task set b as a list of Task objects.
+        """
+        return [
+            Task(tid, period, exec_time, deadline)
+            for tid, period, exec_time, deadline in zip(
+                self.tids[b].tolist(), self.periods[b].tolist(),
+                self.exec_times[b].tolist(), self.deadlines[b].tolist(),
+            )
+        ]
+
+    def specs(self, b):
+        """
+        Task set b as (tid, period, exec_time, deadline) tuples (for
+        cached_simulation, sweep configs, ...).
+        """
+        return list(zip(self.tids[b].tolist(), self.periods[b].tolist(),
+                        self.exec_times[b].tolist(), self.deadlines[b].tolist()))
+
+
+def generate(n_sets, n_tasks, utilization, method="uunifast-discard",
+             periods="log-uniform", period_range=(10, 1000), granularity=1,
+             harmonic_factor=2, deadline_range=(1.0, 1.0), seed=None):
+    """
+    n_sets random task sets of n_tasks tasks each, with total
+    utilization 'utilization', as a Workload.
+
+    method: how the utilization is split over the tasks (see
+        UTILIZATION_METHODS); task utilizations stay <= 1 except with
+        plain "uunifast"
+    periods: "log-uniform", "uniform" or "harmonic", over period_range;
+        granularity rounds the first two, harmonic_factor is the ratio
+        between harmonic periods
+    deadline_range: (low, high) fraction of the slack period - exec_time
+        added to the exec_time to get the deadline; (1, 1) gives implicit
+        deadlines (= period)
+    seed: int / SeedSequence / Generator; the same seed and arguments
+        always give the same sets
+
+    Execution times are rounded to whole time units (at least 1, at most
+    the deadline), so the actual utilization is a little off the target
+    for short periods; Workload.utilization() has the actual values.
+    """
+    if method not in UTILIZATION_METHODS:
+        raise ValueError(f"unknown method: {method} (known: {', '.join(UTILIZATION_METHODS)})")
+    if periods not in PERIOD_GENERATORS:
+        raise ValueError(f"unknown period distribution: {periods} "
+                         f"(known: {', '.join(PERIOD_GENERATORS)})")
+    low_d, high_d = deadline_range
+    if not 0 <= low_d <= high_d <= 1:
+        raise ValueError("deadline_range needs 0 <= low <= high <= 1")
+    rng = make_rng(seed)
+
+    # 1. task utilizations
+    if method == "uunifast":
+        shares = uunifast(n_sets, n_tasks, utilization, rng)
+    elif method == "uunifast-discard":
+        shares = uunifast_discard(n_sets, n_tasks, utilization, rng)
+    else:
+        shares = randfixedsum(n_sets, n_tasks, utilization, rng)
+
+    # 2. periods
+    low, high = period_range
+    if periods == "harmonic":
+        period = harmonic_periods(n_sets, n_tasks, low, high, rng, harmonic_factor)
+    else:
+        period = PERIOD_GENERATORS[periods](n_sets, n_tasks, low, high, rng, granularity)
+
+    # 3. execution times and deadlines
+    exec_time = np.clip(np.rint(shares * period), 1, period).astype(np.int64)
+    if low_d == high_d == 1:
+        deadline = period.copy()
+    else:
+        fraction = rng.uniform(low_d, high_d, (n_sets, n_tasks))
+        deadline = exec_time + np.rint((period - exec_time) * fraction).astype(np.int64)
+
+    tids = np.broadcast_to(np.arange(1, n_tasks + 1, dtype=np.int64), (n_sets, n_tasks))
+    return Workload(tids, period.astype(np.int64), exec_time, deadline)
+
+
+def iter_workloads(n_sets, n_tasks, utilization, seed=0, block=BLOCK, **options):
+    """
+    generate() in blocks of 'block' sets (the last one smaller), for
+    millions of sets in bounded memory. Block i uses the seed
+    SeedSequence(seed).spawn(...)[i], so the sets depend only on 'seed',
+    'block' and the options, not on how many blocks are read.
+    """
+    blocks = -(-n_sets // block)
+    seeds = np.random.SeedSequence(seed).spawn(blocks)
+    for i, block_seed in enumerate(seeds):
+        size = min(block, n_sets - i * block)
+        yield generate(size, n_tasks, utilization, seed=block_seed, **options)
+
+
+def random_task_set(n_tasks, utilization, seed=None, **options):
+    """
+    One random task set (see generate() for the options) as a TaskSet.
+    """
+    return generate(1, n_tasks, utilization, seed=seed, **options).task_set(0)
+
+
+if __name__ == "__main__":
+    workload = generate(5, 4, 0.9, seed=1)
+    for b in range(workload.n_sets):
+        print(f"U={workload.utilization()[b]:.3f}", workload.specs(b))